@@ -27,6 +27,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'events.middleware.MetricsMiddleware',
+    'events.replicas.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -68,6 +70,50 @@ DATABASES = {
     }
 }
 
+# Read replicas, e.g. DATABASE_REPLICA_HOSTS=db-replica-1,db-replica-2. GET/HEAD
+# requests to REPLICA_READ_VIEWS read from one of them (see events.replicas);
+# a client is pinned to the primary for REPLICA_PIN_SECONDS after its own POST.
+for number, host in enumerate(filter(None, os.environ.get('DATABASE_REPLICA_HOSTS', '').split(',')), start=1):
+    DATABASES[f'replica{number}'] = {**DATABASES['default'], 'HOST': host.strip(), 'TEST': {'MIRROR': 'default'}}
+DATABASE_ROUTERS = ['events.replicas.ReplicaRouter']
+REPLICA_READ_VIEWS = ['home', 'dashboard', 'event_detail', 'event_invitations', 'admin:*_changelist']
+REPLICA_PIN_SECONDS = 10
+
+# Cache (per-process locmem by default; set REDIS_CACHE_URL to share it across workers)
+REDIS_CACHE_URL = os.environ.get('REDIS_CACHE_URL')
+if REDIS_CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Home page upcoming-events cache
+HOME_CACHE_ALIAS = 'default'
+HOME_CACHE_TIMEOUT = 300
+
+# Request/task metrics served at /metrics/ (set METRICS_ENABLED=0 to drop the middleware)
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # require "Authorization: Bearer <token>" when set
+# Where web and Celery worker processes pool their metrics (in-process only when unset,
+# which leaves /metrics/ showing whichever worker answered and no task timings)
+METRICS_REDIS_URL = os.environ.get('METRICS_REDIS_URL', REDIS_CACHE_URL)
+SLOW_REQUEST_THRESHOLD = None  # seconds; log slow requests with their top queries when set
+SLOW_REQUEST_TOP_QUERIES = 5
+
+# Live organizer dashboards over Server-Sent Events (in-process hub unless a Redis URL is set,
+# which is needed once several workers or Celery publish updates)
+LIVE_UPDATES_REDIS_URL = os.environ.get('LIVE_UPDATES_REDIS_URL', REDIS_CACHE_URL)
+LIVE_STREAM_MAX_AGE = 300  # seconds before a stream closes and the browser reconnects
+LIVE_STREAM_HEARTBEAT = 15
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -122,5 +168,48 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Single invites and reminders go to 'transactional', blasts to 'bulk', so a
+# 50k-guest invite never queues ahead of one urgent email. Run a worker per lane:
+#   celery -A event_management worker -Q transactional -c 2
+#   celery -A event_management worker -Q bulk,default -c 4
+CELERY_TASK_DEFAULT_QUEUE = 'default'
+CELERY_TASK_ROUTES = {
+    'events.tasks.send_invitation_email': {'queue': 'transactional'},
+    'events.tasks.send_reminder_email': {'queue': 'transactional'},
+    'events.tasks.send_invitation_email_batch': {'queue': 'bulk'},
+    'events.tasks.send_reminder_email_batch': {'queue': 'bulk'},
+    'events.tasks.schedule_reminders': {'queue': 'bulk'},
+    'events.tasks.send_event_reminders': {'queue': 'transactional'},
+    'events.tasks.import_guests': {'queue': 'bulk'},
+}
+# Per-worker caps on bulk batches (each batch is up to BULK_INVITE_EMAIL_CHUNK_SIZE emails)
+CELERY_TASK_ANNOTATIONS = {
+    'events.tasks.send_invitation_email_batch': {'rate_limit': '60/m'},
+    'events.tasks.send_reminder_email_batch': {'rate_limit': '60/m'},
+}
+# Take one task at a time so long bulk batches aren't hoarded by a busy worker
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
+# Token bucket for bulk invitation/reminder mail, in messages a second across all
+# workers (shared through Redis when a URL is set); transactional mail is not paced
+EMAIL_BULK_RATE_LIMIT = float(os.environ.get('EMAIL_BULK_RATE_LIMIT', 10)) or None
+EMAIL_BULK_BURST = 100
+EMAIL_RATE_LIMIT_REDIS_URL = os.environ.get('EMAIL_RATE_LIMIT_REDIS_URL', CELERY_BROKER_URL)
+# Reminder emails, as EmailDelivery kind -> seconds before the event starts.
+# Each is queued with an ETA by a sweep that beat runs every
+# REMINDER_SWEEP_INTERVAL seconds (celery -A event_management beat); ETAs stay
+# within two sweeps, well under the Redis broker's one-hour visibility timeout
+REMINDER_OFFSETS = {'reminder': 24 * 60 * 60, 'reminder_2h': 2 * 60 * 60}
+REMINDER_SWEEP_INTERVAL = 15 * 60
+CELERY_BEAT_SCHEDULE = {
+    'schedule-reminders': {
+        'task': 'events.tasks.schedule_reminders',
+        'schedule': REMINDER_SWEEP_INTERVAL,
+    },
+}
+
+# Seconds after which an email claimed by a worker that never reported back may be sent again
+EMAIL_DELIVERY_CLAIM_TIMEOUT = 900
+
 #ip address
 #LOCAL_IP = '192.168.245.155'  # Your Wi-Fi IP
@@ -0,0 +1,29 @@
+"""
+Settings for the test suite, which runs without Postgres, Redis or an SMTP
+server. Two SQLite databases stand in for the primary and a read replica.
+
+    python manage.py test events --settings=event_management.test_settings
+"""
+from .settings import *  # noqa
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'test-primary.sqlite3',
+    },
+    'replica1': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'test-replica.sqlite3',
+    },
+}
+
+CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+CELERY_TASK_ALWAYS_EAGER = True
+CELERY_BROKER_URL = 'memory://'
+CELERY_RESULT_BACKEND = 'cache+memory://'
+EMAIL_BULK_RATE_LIMIT = None
+EMAIL_RATE_LIMIT_REDIS_URL = None
+LIVE_UPDATES_REDIS_URL = None
+METRICS_REDIS_URL = None
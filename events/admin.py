@@ -1,16 +1,107 @@
+from celery import group
+from django.conf import settings
 from django.contrib import admin
-from .models import Event, Invitation
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import caching
+from .exports import EXPORT_FIELDS, streaming_export
+from .models import EmailDelivery, Event, Invitation, RemovedInvitation
+from .pagination import EstimatedCountPaginator
+from .services import CHECK_IN_OK, check_in_guests
+from .tasks import send_invitation_email_batch
 
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
     list_display = ('title', 'start_date', 'end_date', 'created_by', 'is_public')
     list_filter = ('is_public', 'start_date')
+    list_select_related = ('created_by',)
     search_fields = ('title', 'description', 'location')
     date_hierarchy = 'start_date'
+    ordering = ('-start_date', '-id')
+    autocomplete_fields = ('created_by',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+class EventFilter(admin.SimpleListFilter):
+    """
+    The next upcoming events, rather than every event ever made. Any other
+    event can still be filtered on with ?event=<id>.
+    """
+    title = 'event'
+    parameter_name = 'event'
+
+    def lookups(self, request, model_admin):
+        events = list(
+            Event.objects.filter(start_date__gte=timezone.now()).order_by('start_date').values_list('id', 'title')[:20]
+        )
+        selected = self.value()
+        if selected and selected.isdigit() and all(str(pk) != selected for pk, _ in events):
+            events += Event.objects.filter(pk=selected).values_list('id', 'title')
+        return events
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(event_id=self.value())
+        return queryset
 
 @admin.register(Invitation)
 class InvitationAdmin(admin.ModelAdmin):
     list_display = ('name', 'email', 'event', 'status', 'checked_in')
-    list_filter = ('status', 'checked_in')
+    # Event filters use the (event, status, checked_in) index, status alone (status, id)
+    list_filter = (EventFilter, 'status', 'checked_in')
+    list_select_related = ('event',)
     search_fields = ('name', 'email')
-    date_hierarchy = 'created_at'
+    ordering = ('-id',)
+    autocomplete_fields = ('event', 'user')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ('mark_checked_in', 'resend_invitation', 'export_csv')
+
+    def delete_queryset(self, request, queryset):
+        # A queryset delete skips Invitation.delete(), so leave the tombstones, lower
+        # the event counters and invalidate the guests' home lists here
+        user_ids = set(queryset.values_list('user_id', flat=True))
+        with transaction.atomic():
+            RemovedInvitation.record(queryset)
+            Invitation.release_counters(queryset)
+            super().delete_queryset(request, queryset)
+        for user_id in user_ids:
+            caching.invalidate_user(user_id)
+
+    @admin.action(description="Check in selected guests")
+    def mark_checked_in(self, request, queryset):
+        # One conditional UPDATE per event; only accepted guests are checked in
+        uuids = {}
+        for event_id, invitation_uuid in queryset.values_list('event_id', 'uuid'):
+            uuids.setdefault(event_id, []).append(invitation_uuid)
+        checked_in = 0
+        for event in Event.objects.filter(pk__in=uuids):
+            checked_in += sum(result.outcome == CHECK_IN_OK for result in check_in_guests(event, uuids[event.pk]))
+        total = sum(len(values) for values in uuids.values())
+        self.message_user(request, f"Checked in {checked_in} of {total} guests; the rest were "
+                                   f"already checked in or haven't accepted.")
+
+    @admin.action(description="Resend invitation email")
+    def resend_invitation(self, request, queryset):
+        invitation_ids = list(queryset.order_by('id').values_list('id', flat=True))
+        # Make earlier deliveries claimable again, keeping their attempts and errors;
+        # leave ones in flight alone
+        EmailDelivery.objects.filter(invitation_id__in=invitation_ids, kind='invitation').exclude(
+            status='sending',
+        ).update(status='pending', updated_at=timezone.now())
+        base_url = request.build_absolute_uri('/')
+        chunk_size = getattr(settings, 'BULK_INVITE_EMAIL_CHUNK_SIZE', 100)
+        group(
+            send_invitation_email_batch.s(invitation_ids[start:start + chunk_size], base_url)
+            for start in range(0, len(invitation_ids), chunk_size)
+        ).apply_async()
+        self.message_user(request, f"Queued invitation emails for {len(invitation_ids)} guests.")
+
+    @admin.action(description="Export selected guests as CSV")
+    def export_csv(self, request, queryset):
+        return streaming_export(
+            queryset.annotate(event_title=F('event__title')).order_by('id'), ('event_title',) + EXPORT_FIELDS, 'csv',
+            f"invitations-{timezone.now():%Y%m%d-%H%M%S}",
+        )
@@ -0,0 +1,54 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .metrics import get_registry
+
+GENERATION_KEY = 'home:generation'
+
+
+def _cache():
+    return caches[getattr(settings, 'HOME_CACHE_ALIAS', 'default')]
+
+
+def _user_version_key(user_id):
+    return f'home:user-version:{user_id}'
+
+
+def get_upcoming_events(user, build):
+    """
+    Return the home page event list for ``user``, calling ``build`` to
+    compute it on a miss. Anonymous visitors share one entry; signed-in users
+    each get their own, invalidated by bumping a version key rather than by
+    deleting entries.
+    """
+    cache = _cache()
+    keys = [GENERATION_KEY]
+    if user.is_authenticated:
+        keys.append(_user_version_key(user.pk))
+    versions = cache.get_many(keys)
+
+    generation = versions.get(GENERATION_KEY, 0)
+    if user.is_authenticated:
+        key = f'home:events:{generation}:user:{user.pk}:{versions.get(keys[1], 0)}'
+    else:
+        key = f'home:events:{generation}:anonymous'
+
+    events = cache.get(key)
+    if events is None:
+        get_registry().inc('events_home_cache_requests_total', ('result', 'miss'))
+        events = list(build())
+        cache.set(key, events, getattr(settings, 'HOME_CACHE_TIMEOUT', 300))
+    else:
+        get_registry().inc('events_home_cache_requests_total', ('result', 'hit'))
+    return events
+
+
+def invalidate_all():
+    # Timestamps rather than incr(), so an evicted counter can't restart at an old value
+    _cache().set(GENERATION_KEY, time.time_ns(), None)
+
+
+def invalidate_user(user_id):
+    _cache().set(_user_version_key(user_id), time.time_ns(), None)
@@ -0,0 +1,30 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.http import Http404
+
+
+async def ais_authenticated(request):
+    """
+    Resolve ``request.user`` off the event loop; it loads the session and user
+    from the database on first access. Later sync reads of it are then free.
+    """
+    return await sync_to_async(lambda: request.user.is_authenticated)()
+
+
+def async_login_required(view_func):
+    """login_required for ``async def`` views, which Django 4.2's decorator cannot wrap."""
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        if not await ais_authenticated(request):
+            return redirect_to_login(request.get_full_path())
+        return await view_func(request, *args, **kwargs)
+    return wrapper
+
+
+async def aget_object_or_404(queryset, **kwargs):
+    try:
+        return await queryset.aget(**kwargs)
+    except queryset.model.DoesNotExist:
+        raise Http404(f"No {queryset.model._meta.object_name} matches the given query.")
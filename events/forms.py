@@ -1,6 +1,7 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
+from django.core.validators import validate_email
 from .models import Event, Invitation
 
 class CustomUserCreationForm(UserCreationForm):
@@ -38,13 +39,24 @@ class BulkInvitationForm(forms.Form):
         data = self.cleaned_data['emails']
         emails = [email.strip() for email in data.split('\n') if email.strip()]
         
-        # Validate each email
+        # Validate each email with the shared validator rather than a new form field per line
         for email in emails:
-            if not forms.EmailField().clean(email):
+            try:
+                validate_email(email)
+            except forms.ValidationError:
                 raise forms.ValidationError(f"Invalid email: {email}")
         
         return emails
 
+class GuestImportForm(forms.Form):
+    file = forms.FileField(help_text="CSV with an 'email' column and an optional 'name' column")
+
+    def clean_file(self):
+        upload = self.cleaned_data['file']
+        if not upload.name.lower().endswith('.csv'):
+            raise forms.ValidationError("Please upload a .csv file.")
+        return upload
+
 class RSVPForm(forms.Form):
     CHOICES = [
         ('accepted', 'Yes, I will attend'),
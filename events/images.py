@@ -0,0 +1,108 @@
+import hashlib
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+
+# Widths of the resized copies; none is wider than the original
+VARIANT_WIDTHS = (320, 640, 1024, 1600)
+
+# key -> (Pillow format, MIME type, save options)
+VARIANT_FORMATS = {
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def build_variants(event):
+    """
+    Strip EXIF from ``event.image`` and write resized WebP and JPEG copies
+    next to it. Returns the new ``image_variants`` dict, or None when the
+    image is unchanged since the variants were last built.
+
+    ``sha256`` in the dict is the hash of the bytes as uploaded and
+    ``source_sha256`` that of the (EXIF-free) file at ``source``, so a
+    re-upload of the same picture under any name reuses the work done.
+    """
+    current = event.image_variants or {}
+    if not event.image:
+        delete_variants(event.image.storage, current)
+        return {}
+
+    storage = event.image.storage
+    with event.image.open('rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if current.get('source') == event.image.name and current.get('source_sha256') == digest:
+        return None
+    if current.get('sha256') == digest and current.get('source') and storage.exists(current['source']):
+        # The same picture uploaded again: go back to the copy already stripped
+        # and resized instead of keeping a second one
+        storage.delete(event.image.name)
+        event.image.name = current['source']
+        return dict(current)
+
+    source_digest = digest
+    image = Image.open(BytesIO(data))
+    source_format = 'JPEG' if image.format == 'MPO' else image.format
+    if image.getexif():
+        # Phone photos carry GPS and camera details; rewrite the original without
+        # them, turned upright since the orientation tag goes too
+        image = ImageOps.exif_transpose(image)
+        data = _encode(image, source_format, {'quality': 90} if source_format == 'JPEG' else None)
+        storage.delete(event.image.name)
+        event.image.name = storage.save(event.image.name, ContentFile(data))
+        source_digest = hashlib.sha256(data).hexdigest()
+    image.load()
+
+    stem = os.path.splitext(event.image.name)[0]
+    variants = {
+        'source': event.image.name,
+        'sha256': digest,
+        'source_sha256': source_digest,
+        'width': image.width,
+        'height': image.height,
+    }
+    widths = [width for width in getattr(settings, 'EVENT_IMAGE_WIDTHS', VARIANT_WIDTHS) if width < image.width]
+    for key, (fmt, _, options) in VARIANT_FORMATS.items():
+        variants[key] = []
+        for width in widths + [image.width]:
+            resized = image.copy()
+            resized.thumbnail((width, width * image.height // image.width), Image.LANCZOS)
+            # The hash in the name lets these be served with far-future cache headers
+            name = storage.save(f"{stem}.{source_digest[:12]}.{width}w.{key}", ContentFile(_encode(resized, fmt, options)))
+            variants[key].append([width, name])
+
+    delete_variants(storage, current, keep=variants)
+    return variants
+
+
+def delete_variants(storage, variants, keep=None):
+    kept = {name for key in VARIANT_FORMATS for _, name in (keep or {}).get(key, ())}
+    for key in VARIANT_FORMATS:
+        for _, name in variants.get(key, ()):
+            if name not in kept:
+                storage.delete(name)
+
+
+def srcset(event, key):
+    """``srcset`` value for ``event``'s variants in format ``key``, or '' if none are ready."""
+    variants = event.image_variants or {}
+    if not event.image or variants.get('source') != event.image.name:
+        return ''
+    storage = event.image.storage
+    return ', '.join(f"{storage.url(name)} {width}w" for width, name in variants.get(key, ()))
+
+
+def _encode(image, fmt, options=None):
+    if fmt == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    elif fmt == 'WEBP' and image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    buffer = BytesIO()
+    # Saving without exif= drops the metadata; the colour profile is kept
+    image.save(buffer, format=fmt, icc_profile=image.info.get('icc_profile'), **(options or {}))
+    return buffer.getvalue()
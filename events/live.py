@@ -0,0 +1,173 @@
+import asyncio
+import itertools
+import json
+import logging
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+
+
+logger = logging.getLogger(__name__)
+
+# Sent to a subscriber that fell too far behind; it should reload its counters
+RESYNC = json.dumps({'type': 'resync'})
+
+
+def channel_name(event_id):
+    return f'events:live:{event_id}'
+
+
+class InMemoryHub:
+    """
+    Fan-out within one process. Enough for a single ASGI worker and for
+    tests; use RedisHub once web workers or Celery publish from elsewhere.
+    """
+
+    def __init__(self, queue_size=1000):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def publish(self, channel, data):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, data)
+            except RuntimeError:
+                # The subscriber's loop has closed; it unsubscribes itself
+                pass
+
+    async def apublish(self, channel, data):
+        self.publish(channel, data)
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        entry = (asyncio.get_running_loop(), asyncio.Queue(maxsize=self.queue_size))
+        with self._lock:
+            self._subscribers[channel].add(entry)
+        try:
+            yield _QueueSubscription(entry[1])
+        finally:
+            with self._lock:
+                self._subscribers[channel].discard(entry)
+                if not self._subscribers[channel]:
+                    del self._subscribers[channel]
+
+    def _offer(self, queue, data):
+        try:
+            queue.put_nowait(data)
+        except asyncio.QueueFull:
+            # Drop the backlog rather than memory; the stream reloads its state
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC)
+
+
+class RedisHub:
+    """Fan-out across processes over Redis pub/sub."""
+
+    def __init__(self, url):
+        import redis
+
+        self.url = url
+        self._client = redis.Redis.from_url(url)
+
+    def publish(self, channel, data):
+        try:
+            self._client.publish(channel, data)
+        except Exception:
+            # Live updates are best-effort; the write they describe already happened
+            logger.warning("Could not publish to %s", channel, exc_info=True)
+
+    async def apublish(self, channel, data):
+        await sync_to_async(self.publish, thread_sensitive=False)(channel, data)
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        import redis.asyncio
+
+        client = redis.asyncio.Redis.from_url(self.url)
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(channel)
+        try:
+            yield _RedisSubscription(pubsub)
+        finally:
+            await pubsub.unsubscribe(channel)
+            await pubsub.close()
+            await client.close()
+
+
+class _QueueSubscription:
+    def __init__(self, queue):
+        self.queue = queue
+
+    async def get(self, timeout):
+        """Next message, or None if nothing arrives within ``timeout`` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class _RedisSubscription:
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    async def get(self, timeout):
+        # Let redis time the wait; cancelling a read mid-reply would desync the connection
+        deadline = asyncio.get_running_loop().time() + timeout
+        while True:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                return None
+            message = await self.pubsub.get_message(timeout=remaining)
+            if message and message['type'] == 'message':
+                return message['data'].decode()
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def get_hub():
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            url = getattr(settings, 'LIVE_UPDATES_REDIS_URL', None)
+            _hub = RedisHub(url) if url else InMemoryHub()
+        return _hub
+
+
+def _update(counters, activity):
+    limit = getattr(settings, 'LIVE_ACTIVITY_LIMIT', 20)
+    return json.dumps({
+        'type': 'update',
+        'counters': {field: delta for field, delta in counters.items() if delta},
+        # Large batches only send their first few names; the counters stay exact
+        'activity': list(itertools.islice(activity, limit)),
+    }, default=str)
+
+
+def guest_activity(kind, invitation):
+    return {
+        'kind': kind,
+        'uuid': str(invitation.uuid),
+        'name': invitation.name,
+        'status': invitation.status,
+        'checked_in_at': invitation.checked_in_at,
+    }
+
+
+def publish_update(event_id, counters, activity=()):
+    """Announce counter deltas and guest activity on ``event_id`` once the transaction commits."""
+    data = _update(counters, activity)
+    transaction.on_commit(lambda: get_hub().publish(channel_name(event_id), data))
+
+
+async def apublish_update(event_id, counters, activity=()):
+    await get_hub().apublish(channel_name(event_id), _update(counters, activity))
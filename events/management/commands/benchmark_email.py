@@ -0,0 +1,71 @@
+import datetime
+import time
+import uuid
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from events.models import EmailDelivery, Event, Invitation
+from events.tasks import send_invitation_email, send_invitation_email_batch
+
+
+class Command(BaseCommand):
+    help = "Measure invitation email throughput against the locmem backend (no data is kept)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=1000, help="Number of invitations to send")
+        parser.add_argument('--chunk-size', type=int, default=100, help="Messages per send_messages() call")
+        parser.add_argument('--single', action='store_true', help="Also time the one-task-per-guest path")
+
+    def handle(self, *args, **options):
+        count = options['count']
+
+        with override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', EMAIL_BULK_RATE_LIMIT=None), transaction.atomic():
+            invitation_ids = self._seed(count)
+
+            mail.outbox = []
+            elapsed = self._time(lambda: send_invitation_email_batch(invitation_ids, 'http://testserver', options['chunk_size']))
+            self._report('batch', len(mail.outbox), elapsed)
+
+            if options['single']:
+                # Forget the batch's deliveries so the single path sends to everyone again
+                EmailDelivery.objects.filter(invitation_id__in=invitation_ids).delete()
+                mail.outbox = []
+                elapsed = self._time(lambda: [
+                    send_invitation_email(invitation_id, 'http://testserver/') for invitation_id in invitation_ids
+                ])
+                self._report('single', len(mail.outbox), elapsed)
+
+            transaction.set_rollback(True)
+
+    def _seed(self, count):
+        organizer = User.objects.create(username=f"benchmark-{uuid.uuid4().hex[:12]}")
+        now = timezone.now()
+        event = Event.objects.create(
+            title="Email benchmark",
+            description="Temporary event for benchmark_email",
+            location="Nowhere",
+            start_date=now + datetime.timedelta(days=7),
+            end_date=now + datetime.timedelta(days=7, hours=3),
+            created_by=organizer,
+        )
+        invitations = Invitation.objects.bulk_create(
+            Invitation(event=event, user=organizer, email=f"guest{i}@example.com", name=f"Guest {i}")
+            for i in range(count)
+        )
+        if invitations and invitations[0].pk is None:
+            return list(event.invitations.values_list('id', flat=True))
+        return [invitation.pk for invitation in invitations]
+
+    def _time(self, func):
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
+
+    def _report(self, label, sent, elapsed):
+        rate = sent / elapsed if elapsed else 0
+        self.stdout.write(f"{label}: {sent} messages in {elapsed:.3f}s ({rate:.0f} msg/s)")
@@ -0,0 +1,104 @@
+import datetime
+import re
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, Exists, OuterRef, Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from events.models import Event, Invitation
+from events.seeding import seed_dataset
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the hot queries of events.views/events.tasks and flag sequential scans"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', action='store_true',
+                            help="Run against a freshly seeded dataset (rolled back afterwards)")
+        parser.add_argument('--users', type=int, default=2000)
+        parser.add_argument('--events', type=int, default=500)
+        parser.add_argument('--invitations-per-event', type=int, default=200)
+        parser.add_argument('--verbose-plans', action='store_true', help="Print every plan, not only flagged ones")
+        parser.add_argument('--fail-on-seq-scan', action='store_true', help="Exit with an error if any scan is flagged")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['seed']:
+                seed_dataset(
+                    users=options['users'],
+                    events=options['events'],
+                    invitations_per_event=options['invitations_per_event'],
+                )
+                if connection.vendor == 'postgresql':
+                    # Fresh rows have no planner statistics until analysed
+                    with connection.cursor() as cursor:
+                        cursor.execute("ANALYZE events_event, events_invitation, auth_user")
+            flagged = self._audit(options['verbose_plans'])
+            transaction.set_rollback(True)
+
+        if flagged:
+            message = f"{len(flagged)} hot queries use sequential scans: {', '.join(flagged)}"
+            if options['fail_on_seq_scan']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS("No sequential scans in hot queries"))
+
+    def _audit(self, verbose):
+        flagged = []
+        for name, queryset in self._hot_queries():
+            plan = queryset.explain()
+            scans = self._sequential_scans(plan)
+            if scans:
+                flagged.append(name)
+                self.stdout.write(self.style.WARNING(f"[seq scan] {name}: {', '.join(scans)}"))
+            else:
+                self.stdout.write(f"[ok] {name}")
+            if scans or verbose:
+                self.stdout.write(plan + "\n")
+        return flagged
+
+    def _sequential_scans(self, plan):
+        if connection.vendor == 'postgresql':
+            return re.findall(r'Seq Scan on (\w+)', plan)
+        # SQLite: "SCAN table" is a full scan, "SEARCH table USING INDEX" is not
+        return [match for match in re.findall(r'\bSCAN (\w+)\b(?! USING)', plan) if not match.startswith('CONSTANT')]
+
+    def _hot_queries(self):
+        now = timezone.now()
+        invitation = Invitation.objects.order_by('-event__accepted_count').select_related('event').first()
+        if invitation is None:
+            raise CommandError("No invitations to explain against; pass --seed.")
+        event, user = invitation.event, invitation.user_id
+        emails = list(User.objects.values_list('email', flat=True)[:100])
+
+        return [
+            ('home (public)', Event.objects.filter(is_public=True, end_date__gte=now).order_by('start_date')[:5]),
+            ('dashboard created', Event.objects.filter(created_by=event.created_by_id, end_date__gte=now)
+                .order_by('-start_date', '-id')[:21]),
+            ('dashboard invited', Event.objects.filter(
+                Exists(Invitation.objects.filter(event=OuterRef('pk'), user=user)), end_date__gte=now,
+            ).order_by('-start_date', '-id')[:21]),
+            ('invitations page', Invitation.objects.filter(event=event).order_by('-created_at', '-id')[:51]),
+            ('invitation status counts', Invitation.objects.filter(event=event).values('event').annotate(
+                accepted=Count('id', filter=Q(status='accepted')),
+                pending=Count('id', filter=Q(status='pending')),
+            )),
+            ('check-in', Invitation.objects.filter(
+                uuid=invitation.uuid, event=event, status='accepted', checked_in=False,
+            )),
+            ('check-in manifest', Invitation.objects.filter(event=event, status='accepted', checked_in=False)
+                .values_list('uuid', flat=True)),
+            ('manifest delta', Invitation.objects.filter(event=event, updated_at__gte=now - datetime.timedelta(hours=1))),
+            ('reminder sweep', Event.objects.filter(
+                start_date__gt=now, start_date__lte=now + datetime.timedelta(hours=24, minutes=30),
+            ).only('id', 'start_date', 'reminder_tasks').order_by('start_date')),
+            ('event reminders', Invitation.objects.filter(event=event, status='accepted')
+                .order_by('id').values_list('id', flat=True)),
+            ('user by email', User.objects.annotate(email_lower=Lower('email')).filter(
+                email_lower__in=[email.lower() for email in emails],
+            )),
+        ]
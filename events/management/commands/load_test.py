@@ -0,0 +1,180 @@
+import http.client
+import json
+import statistics
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent RSVP and check-in requests at a running server and report throughput and "
+        "latency per concurrency level. Run it once against the WSGI deployment "
+        "(e.g. gunicorn event_management.wsgi -w 4) with --save, then against the ASGI one "
+        "(e.g. uvicorn event_management.asgi:application --workers 4) with --compare. "
+        "The server must use the same database as this command."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help="Base URL of the server under test")
+        parser.add_argument('--event', type=int, help="Event to target (default: the largest upcoming one)")
+        parser.add_argument('--scenario', choices=['rsvp', 'check-in'], action='append',
+                            help="Scenario to run; repeat for several (default: both)")
+        parser.add_argument('--concurrency', default='10,50,200',
+                            help="Comma-separated numbers of concurrent clients")
+        parser.add_argument('--requests', type=int, default=2000, help="Requests per concurrency level")
+        parser.add_argument('--timeout', type=float, default=30.0)
+        parser.add_argument('--label', default='', help="Name for this run in the report, e.g. 'uvicorn'")
+        parser.add_argument('--save', metavar='PATH', help="Write the results to PATH as JSON")
+        parser.add_argument('--compare', metavar='PATH', help="Print these results next to a saved run")
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(value) for value in options['concurrency'].split(',') if value.strip()]
+        except ValueError:
+            raise CommandError("--concurrency must be a comma-separated list of integers.")
+        url = urlsplit(options['url'])
+        if url.scheme not in ('http', 'https') or not url.hostname:
+            raise CommandError("--url must be an http(s) URL.")
+        self.url = url
+        self.timeout = options['timeout']
+
+        events = Event.objects.filter(end_date__gt=timezone.now())
+        if options['event']:
+            events = events.filter(pk=options['event'])
+        # Order by guest total, which RSVPs don't change, so repeated runs hit the same event
+        event = events.order_by((F('accepted_count') + F('pending_count') + F('declined_count')).desc(), 'id').first()
+        if event is None:
+            raise CommandError("No upcoming event to target; run seed_data first.")
+        # A real session and CSRF pair so the server sees an ordinary logged-in organizer
+        client = Client()
+        client.force_login(event.created_by)
+        csrf_token = get_random_string(32)
+        self.cookie = (
+            f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}; "
+            f"{settings.CSRF_COOKIE_NAME}={csrf_token}"
+        )
+        self.csrf_token = csrf_token
+
+        invited = list(event.invitations.values_list('uuid', flat=True)[:1000])
+        accepted = list(event.invitations.filter(status='accepted').values_list('uuid', flat=True)[:1000])
+        scenarios = {
+            'rsvp': (invited, lambda i, uuid: self._rsvp(uuid, 'accepted' if i % 2 else 'declined')),
+            'check-in': (accepted, lambda i, uuid: self._check_in(event.pk, uuid)),
+        }
+
+        results = {}
+        for name in options['scenario'] or ['rsvp', 'check-in']:
+            uuids, request = scenarios[name]
+            if not uuids:
+                raise CommandError(f"Event {event.pk} has no invitations for the {name} scenario.")
+            for concurrency in levels:
+                results[f"{name} c={concurrency}"] = self._run(request, uuids, concurrency, options['requests'])
+
+        self._report(options['label'] or options['url'], results)
+        if options['save']:
+            with open(options['save'], 'w') as f:
+                json.dump({'label': options['label'] or options['url'], 'results': results}, f, indent=2, sort_keys=True)
+            self.stdout.write(f"Results written to {options['save']}")
+        if options['compare']:
+            self._compare(results, options['compare'])
+
+    def _rsvp(self, uuid, response):
+        body = urlencode({'response': response, 'csrfmiddlewaretoken': self.csrf_token})
+        return 'POST', reverse('rsvp', kwargs={'uuid': uuid}), body, 'application/x-www-form-urlencoded'
+
+    def _check_in(self, pk, uuid):
+        body = json.dumps({'uuid': str(uuid)})
+        return 'POST', reverse('check_in_api', kwargs={'pk': pk}), body, 'application/json'
+
+    def _run(self, request, uuids, concurrency, total):
+        lock = threading.Lock()
+        issued = iter(range(total))
+        timings = []
+        errors = []
+
+        def worker():
+            connection_class = http.client.HTTPSConnection if self.url.scheme == 'https' else http.client.HTTPConnection
+            connection = connection_class(self.url.hostname, self.url.port, timeout=self.timeout)
+            while True:
+                with lock:
+                    i = next(issued, None)
+                if i is None:
+                    break
+                method, path, body, content_type = request(i, uuids[i % len(uuids)])
+                start = time.perf_counter()
+                try:
+                    connection.request(method, path, body=body, headers={
+                        'Content-Type': content_type,
+                        'Cookie': self.cookie,
+                        'X-CSRFToken': self.csrf_token,
+                    })
+                    response = connection.getresponse()
+                    response.read()
+                    failed = response.status >= 400
+                except (OSError, http.client.HTTPException):
+                    connection.close()
+                    failed = True
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    (errors if failed else timings).append(elapsed)
+            connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duration = time.perf_counter() - start
+
+        timings.sort()
+        return {
+            'requests': total,
+            'errors': len(errors),
+            'rps': round(len(timings) / duration, 1),
+            'p50_ms': round(statistics.median(timings), 3) if timings else None,
+            'p95_ms': self._percentile(timings, 0.95),
+            'p99_ms': self._percentile(timings, 0.99),
+        }
+
+    def _percentile(self, timings, fraction):
+        if not timings:
+            return None
+        return round(timings[min(len(timings) - 1, int(len(timings) * fraction))], 3)
+
+    def _report(self, label, results):
+        self.stdout.write(f"Results for {label}")
+        self.stdout.write(f"{'scenario':<20}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<20}{result['rps']:>10.1f}{self._ms(result['p50_ms'])}{self._ms(result['p95_ms'])}"
+                f"{self._ms(result['p99_ms'])}{result['errors']:>8}"
+            )
+
+    def _ms(self, value):
+        return f"{value:>10.2f}" if value is not None else f"{'-':>10}"
+
+    def _compare(self, results, path):
+        with open(path) as f:
+            saved = json.load(f)
+        self.stdout.write(f"Compared with {saved['label']}")
+        self.stdout.write(f"{'scenario':<20}{'rps':>10}{'was':>10}{'p95 ms':>10}{'was':>10}")
+        for name, result in results.items():
+            before = saved['results'].get(name)
+            if before is None:
+                continue
+            self.stdout.write(
+                f"{name:<20}{result['rps']:>10.1f}{before['rps']:>10.1f}"
+                f"{self._ms(result['p95_ms'])}{self._ms(before['p95_ms'])}"
+            )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from events.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the event full-text index (Postgres search_vector or SQLite FTS5 table)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        rebuild_search_index(using=options['database'])
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt"))
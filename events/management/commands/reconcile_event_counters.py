@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+
+from events.models import Event, Invitation
+
+
+class Command(BaseCommand):
+    help = "Recount each event's accepted/pending/declined/checked-in counters from its invitations"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--event', type=int, action='append', dest='events', help="Only reconcile this event id (repeatable)")
+        parser.add_argument('--dry-run', action='store_true', help="Report drift without fixing it")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        events = Event.objects.order_by('pk')
+        if options['events']:
+            events = events.filter(pk__in=options['events'])
+        event_ids = list(events.values_list('pk', flat=True))
+        batch_size = options['batch_size']
+
+        drifted = 0
+        for start in range(0, len(event_ids), batch_size):
+            batch = event_ids[start:start + batch_size]
+            with transaction.atomic():
+                locked = Event.objects.filter(pk__in=batch).order_by('pk').only('pk', *Event.COUNTER_FIELDS)
+                if not options['dry_run']:
+                    # Hold the rows while counting: an invitation saved meanwhile waits to bump
+                    # its counter until after our write, or has committed before we count it
+                    locked = locked.select_for_update()
+                locked = list(locked)
+                changed = self._recount(locked)
+                if changed and not options['dry_run']:
+                    Event.objects.bulk_update(changed, Event.COUNTER_FIELDS)
+            drifted += len(changed)
+
+        verb = "would fix" if options['dry_run'] else "fixed"
+        self.stdout.write(self.style.SUCCESS(f"{drifted} events with drifted counters {verb}"))
+
+    def _recount(self, events):
+        # One grouped aggregate per batch instead of four counts per event
+        actual = {
+            row.pop('event_id'): row
+            for row in Invitation.objects.filter(event_id__in=[event.pk for event in events]).order_by()
+            .values('event_id').annotate(
+                accepted_count=Count('id', filter=Q(status='accepted')),
+                pending_count=Count('id', filter=Q(status='pending')),
+                declined_count=Count('id', filter=Q(status='declined')),
+                checked_in_count=Count('id', filter=Q(checked_in=True)),
+            )
+        }
+        empty = dict.fromkeys(Event.COUNTER_FIELDS, 0)
+
+        changed = []
+        for event in events:
+            counts = actual.get(event.pk, empty)
+            if any(getattr(event, field) != counts[field] for field in Event.COUNTER_FIELDS):
+                for field in Event.COUNTER_FIELDS:
+                    setattr(event, field, counts[field])
+                changed.append(event)
+        return changed
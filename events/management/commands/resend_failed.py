@@ -0,0 +1,62 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+
+from events.models import EmailDelivery
+from events.tasks import send_invitation_email_batch, send_reminder_email_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Queue failed invitation or reminder emails (and sends abandoned mid-flight) for another "
+        "attempt. Sent and permanently rejected emails are never resent."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=[kind for kind, _ in EmailDelivery.KIND_CHOICES], required=True)
+        parser.add_argument('--base-url', help="Site URL for RSVP links; required for invitations")
+        parser.add_argument('--older-than', type=int, default=0,
+                            help="Only failures last attempted at least this many minutes ago")
+        parser.add_argument('--max-attempts', type=int, help="Skip deliveries already tried this many times")
+        parser.add_argument('--batch-size', type=int, default=getattr(settings, 'BULK_INVITE_EMAIL_CHUNK_SIZE', 100))
+        parser.add_argument('--dry-run', action='store_true', help="Count what would be queued")
+
+    def handle(self, *args, **options):
+        kind = options['kind']
+        if kind == 'invitation' and not options['base_url']:
+            raise CommandError("--base-url is required to resend invitations")
+
+        now = timezone.now()
+        abandoned = now - datetime.timedelta(seconds=getattr(settings, 'EMAIL_DELIVERY_CLAIM_TIMEOUT', 900))
+        deliveries = EmailDelivery.objects.filter(
+            Q(status='failed', updated_at__lte=now - datetime.timedelta(minutes=options['older_than']))
+            | Q(status='sending', updated_at__lt=abandoned),
+            kind=kind,
+        )
+        if options['max_attempts']:
+            deliveries = deliveries.filter(attempts__lt=options['max_attempts'])
+
+        # Walk by id so each batch is an index range scan, not an ever-growing OFFSET
+        queued = 0
+        last_id = 0
+        while True:
+            batch = list(
+                deliveries.filter(id__gt=last_id).order_by('id').values_list('id', 'invitation_id')[:options['batch_size']]
+            )
+            if not batch:
+                break
+            last_id = batch[-1][0]
+            invitation_ids = [invitation_id for _, invitation_id in batch]
+            queued += len(invitation_ids)
+            if options['dry_run']:
+                continue
+            if kind == 'invitation':
+                send_invitation_email_batch.delay(invitation_ids, options['base_url'])
+            else:
+                send_reminder_email_batch.delay(invitation_ids, kind=kind)
+
+        verb = "would be queued" if options['dry_run'] else "queued"
+        self.stdout.write(self.style.SUCCESS(f"{queued} {kind} emails {verb} for resending"))
@@ -0,0 +1,156 @@
+import json
+import statistics
+import time
+
+from celery import current_app
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import EmailDelivery, Event, Invitation
+from events.seeding import seed_dataset
+from events.tasks import schedule_reminders, send_invitation_email_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the main views and tasks on a seeded dataset (rolled back afterwards), "
+        "report p50/p95 latency and query counts, and compare against a JSON baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--events', type=int, default=50)
+        parser.add_argument('--invitations-per-event', type=int, default=500)
+        parser.add_argument('--bulk-size', type=int, default=100, help="Emails per bulk_invite request")
+        parser.add_argument('--save-baseline', metavar='PATH', help="Write the results to PATH as JSON")
+        parser.add_argument('--baseline', metavar='PATH', help="Fail if results regress against PATH")
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help="Allowed p95 slowdown against the baseline, as a fraction")
+
+    def handle(self, *args, **options):
+        self.iterations = options['iterations']
+        app = current_app
+        eager = app.conf.task_always_eager
+        app.conf.task_always_eager = True
+        try:
+            with override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', EMAIL_BULK_RATE_LIMIT=None), \
+                    transaction.atomic():
+                seed_dataset(
+                    users=options['users'],
+                    events=options['events'],
+                    invitations_per_event=options['invitations_per_event'],
+                    seed=1,
+                )
+                results = self._run(options['bulk_size'])
+                transaction.set_rollback(True)
+        finally:
+            app.conf.task_always_eager = eager
+
+        self._report(results)
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w') as f:
+                json.dump({'iterations': self.iterations, 'results': results}, f, indent=2, sort_keys=True)
+            self.stdout.write(f"Baseline written to {options['save_baseline']}")
+        if options['baseline']:
+            self._compare(results, options['baseline'], options['threshold'])
+
+    def _run(self, bulk_size):
+        event = Event.objects.filter(end_date__gt=timezone.now()).order_by('-accepted_count').first()
+        if event is None:
+            raise CommandError("The seeded dataset has no upcoming events.")
+        organizer = event.created_by
+        guest_invitations = list(event.invitations.filter(status='pending')[:self.iterations])
+        accepted = list(event.invitations.filter(status='accepted', checked_in=False)[:self.iterations])
+        guest = accepted[0].user
+
+        organizer_client = Client()
+        organizer_client.force_login(organizer)
+        guest_client = Client()
+        guest_client.force_login(guest)
+        anonymous_client = Client()
+
+        results = {}
+        results['home'] = self._measure(lambda i: anonymous_client.get(reverse('home')))
+        results['dashboard'] = self._measure(lambda i: guest_client.get(reverse('dashboard')))
+        results['event_detail'] = self._measure(
+            lambda i: guest_client.get(reverse('event_detail', kwargs={'pk': event.pk}))
+        )
+        results['event_invitations'] = self._measure(
+            lambda i: organizer_client.get(reverse('event_invitations', kwargs={'pk': event.pk}))
+        )
+        results['rsvp GET'] = self._measure(
+            lambda i: anonymous_client.get(reverse('rsvp', kwargs={'uuid': guest_invitations[i % len(guest_invitations)].uuid}))
+        )
+        results['rsvp POST'] = self._measure(
+            lambda i: anonymous_client.post(
+                reverse('rsvp', kwargs={'uuid': guest_invitations[i % len(guest_invitations)].uuid}),
+                {'response': 'accepted' if i % 2 else 'declined'},
+            )
+        )
+        results['verify_qr'] = self._measure(
+            lambda i: organizer_client.post(
+                reverse('verify_qr', kwargs={'pk': event.pk}), {'uuid': str(accepted[i % len(accepted)].uuid)}
+            )
+        )
+        results['bulk_invite'] = self._measure(
+            lambda i: organizer_client.post(
+                reverse('bulk_invite', kwargs={'pk': event.pk}),
+                {'emails': '\n'.join(f"bench{i}-{n}@example.com" for n in range(bulk_size))},
+            )
+        )
+
+        invitation_ids = list(Invitation.objects.filter(event=event).values_list('id', flat=True)[:bulk_size])
+        results['task send_invitation_email_batch'] = self._measure(
+            lambda i: send_invitation_email_batch.delay(invitation_ids, 'http://testserver'),
+            # Otherwise every run after the first finds the invitations already sent
+            setup=lambda i: EmailDelivery.objects.filter(invitation_id__in=invitation_ids).delete(),
+        )
+        results['task schedule_reminders'] = self._measure(lambda i: schedule_reminders.delay())
+        return results
+
+    def _measure(self, func, setup=None):
+        timings = []
+        queries = []
+        for i in range(self.iterations):
+            if setup is not None:
+                setup(i)
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                response = func(i)
+                timings.append((time.perf_counter() - start) * 1000)
+            status = getattr(response, 'status_code', 200)
+            if status >= 400:
+                raise CommandError(f"Benchmark request failed with status {status}")
+            queries.append(len(context.captured_queries))
+        timings.sort()
+        return {
+            'p50_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+            'queries': max(queries),
+        }
+
+    def _report(self, results):
+        self.stdout.write(f"{'path':<36}{'p50 ms':>10}{'p95 ms':>10}{'queries':>9}")
+        for name, result in results.items():
+            self.stdout.write(f"{name:<36}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['queries']:>9}")
+
+    def _compare(self, results, path, threshold):
+        with open(path) as f:
+            baseline = json.load(f)['results']
+        regressions = []
+        for name, result in results.items():
+            before = baseline.get(name)
+            if before is None:
+                continue
+            if result['queries'] > before['queries']:
+                regressions.append(f"{name}: {before['queries']} -> {result['queries']} queries")
+            if result['p95_ms'] > before['p95_ms'] * (1 + threshold):
+                regressions.append(f"{name}: p95 {before['p95_ms']:.2f} -> {result['p95_ms']:.2f} ms")
+        if regressions:
+            raise CommandError("Performance regressions:\n  " + "\n  ".join(regressions))
+        self.stdout.write(self.style.SUCCESS(f"No regressions against {path}"))
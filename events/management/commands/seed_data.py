@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from events.seeding import seed_dataset
+
+
+class Command(BaseCommand):
+    help = "Seed synthetic users, events and invitations with bulk inserts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--events', type=int, default=100)
+        parser.add_argument('--invitations-per-event', type=int, default=500)
+        parser.add_argument('--check-in-rate', type=float, default=0.5,
+                            help="Share of accepted guests of past events who checked in")
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=None, help="Random seed for a reproducible dataset")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            events = seed_dataset(
+                users=options['users'],
+                events=options['events'],
+                invitations_per_event=options['invitations_per_event'],
+                check_in_rate=options['check_in_rate'],
+                batch_size=options['batch_size'],
+                seed=options['seed'],
+            )
+        invitations = sum(event.accepted_count + event.pending_count + event.declined_count for event in events)
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {options['users']} users, {len(events)} events and {invitations} invitations"
+        ))
@@ -0,0 +1,139 @@
+import datetime
+import statistics
+import time
+import uuid
+
+from celery import current_app
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from events import throttle
+from events.models import EmailDelivery, Event, Invitation
+from events.tasks import send_invitation_email, send_invitation_email_batch
+
+
+class SimulatedClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class Command(BaseCommand):
+    help = (
+        "Show how long urgent single invitations wait behind a bulk invite burst, with every "
+        "task in one queue versus routed by CELERY_TASK_ROUTES. Tasks run eagerly against the "
+        "locmem email backend and their real run times drive a simulated worker pool; the "
+        "bulk mail token bucket runs on the simulated clock. No data is kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bulk-guests', type=int, default=5000)
+        parser.add_argument('--urgent', type=int, default=20, help="Single invitations sent during the burst")
+        parser.add_argument('--workers', type=int, default=4, help="Worker processes in total")
+        parser.add_argument('--transactional-workers', type=int, default=1,
+                            help="Of --workers, how many consume only the transactional queue when routed")
+        parser.add_argument('--mail-rate', type=float, default=getattr(settings, 'EMAIL_BULK_RATE_LIMIT', None),
+                            help="Bulk mail messages a second (default EMAIL_BULK_RATE_LIMIT; 0 for none)")
+
+    def handle(self, *args, **options):
+        # The configured bucket would really sleep; a simulated one is installed per scenario
+        with override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+                               EMAIL_BULK_RATE_LIMIT=None), \
+                transaction.atomic():
+            bulk_ids, urgent_ids = self._seed(options['bulk_guests'], options['urgent'])
+            chunk_size = getattr(settings, 'BULK_INVITE_EMAIL_CHUNK_SIZE', 100)
+            # The urgent invites arrive just after the burst was queued, the worst case
+            jobs = [
+                (send_invitation_email_batch, (bulk_ids[start:start + chunk_size], 'http://testserver'), False)
+                for start in range(0, len(bulk_ids), chunk_size)
+            ] + [
+                (send_invitation_email, (invitation_id, 'http://testserver/'), True)
+                for invitation_id in urgent_ids
+            ]
+
+            workers = options['workers']
+            transactional = min(options['transactional_workers'], workers - 1)
+            scenarios = {
+                'single queue': [{'default'}] * workers,
+                'routed': [{'transactional'}] * transactional + [{'bulk', 'default'}] * (workers - transactional),
+            }
+            self.stdout.write(
+                f"{'scenario':<16}{'urgent p50 s':>14}{'urgent p95 s':>14}{'urgent max s':>14}{'bulk done s':>13}"
+            )
+            for name, consumers in scenarios.items():
+                # Otherwise the second scenario finds every invitation already sent
+                EmailDelivery.objects.filter(invitation_id__in=bulk_ids + urgent_ids).delete()
+                urgent, finished = self._simulate(jobs, consumers, name == 'routed', options['mail_rate'])
+                urgent.sort()
+                self.stdout.write(
+                    f"{name:<16}{statistics.median(urgent):>14.2f}"
+                    f"{urgent[min(len(urgent) - 1, int(len(urgent) * 0.95))]:>14.2f}"
+                    f"{urgent[-1]:>14.2f}{finished:>13.2f}"
+                )
+            transaction.set_rollback(True)
+
+    def _simulate(self, jobs, consumers, routed, mail_rate):
+        """
+        Hand queued jobs to whichever worker frees up first, as a prefetch-1
+        worker pool would, and return the urgent jobs' latencies and the time
+        the last job finished.
+        """
+        router = current_app.amqp.router
+        queues = [
+            (router.route({}, task.name)['queue'].name if routed else 'default', task, args, urgent)
+            for task, args, urgent in jobs
+        ]
+        clock = SimulatedClock()
+        bucket = throttle.TokenBucket(mail_rate, getattr(settings, 'EMAIL_BULK_BURST', 100),
+                                      clock=clock.time, sleep=clock.sleep) if mail_rate else None
+        previous = throttle.use_bulk_mail_bucket(bucket)
+        free_at = [0.0] * len(consumers)
+        latencies = []
+        try:
+            while queues:
+                # Only workers that consume a queue with work waiting are candidates
+                candidates = [
+                    (free_at[worker], worker) for worker, names in enumerate(consumers)
+                    if any(queue in names for queue, _, _, _ in queues)
+                ]
+                start, worker = min(candidates)
+                index = next(i for i, job in enumerate(queues) if job[0] in consumers[worker])
+                _, task, args, urgent = queues.pop(index)
+
+                clock.now = start
+                began = time.perf_counter()
+                task.apply(args=args)
+                clock.now += time.perf_counter() - began
+                free_at[worker] = clock.now
+                if urgent:
+                    latencies.append(clock.now)
+        finally:
+            throttle.use_bulk_mail_bucket(previous)
+        return latencies, max(free_at)
+
+    def _seed(self, bulk, urgent):
+        organizer = User.objects.create(username=f"latency-{uuid.uuid4().hex[:12]}")
+        now = timezone.now()
+        event = Event.objects.create(
+            title="Task latency",
+            description="Temporary event for task_latency",
+            location="Nowhere",
+            start_date=now + datetime.timedelta(days=7),
+            end_date=now + datetime.timedelta(days=7, hours=3),
+            created_by=organizer,
+        )
+        Invitation.objects.bulk_create(
+            Invitation(event=event, user=organizer, email=f"guest{i}@example.com", name=f"Guest {i}")
+            for i in range(bulk + urgent)
+        )
+        ids = list(event.invitations.order_by('id').values_list('id', flat=True))
+        return ids[:bulk], ids[bulk:]
@@ -0,0 +1,191 @@
+import json
+import logging
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    'events_http_request_duration_seconds': "Request latency by URL name.",
+    'events_http_sql_queries_total': "SQL statements executed by URL name.",
+    'events_http_sql_duration_seconds_total': "Time spent in SQL by URL name.",
+    'events_http_response_bytes_total': "Response body bytes by URL name (non-streaming only).",
+    'events_celery_task_duration_seconds': "Runtime of events.tasks Celery tasks.",
+    'events_home_cache_requests_total': "Home page event list cache lookups by result.",
+}
+
+
+class Histogram:
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """
+    In-process metrics. Enough for a single process and for tests; use
+    RedisRegistry once several web workers or Celery workers record them,
+    or /metrics/ only shows the process that happened to answer. Labelled
+    histograms and counters are created on first use.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = defaultdict(lambda: defaultdict(Histogram))
+        self.counters = defaultdict(lambda: defaultdict(float))
+
+    def observe(self, name, label, value):
+        self.record(observations=[(name, label, value)])
+
+    def inc(self, name, label, value=1):
+        self.record(increments=[(name, label, value)])
+
+    def record(self, observations=(), increments=()):
+        """Record ``(name, label, value)`` histogram observations and counter increments together."""
+        with self._lock:
+            for name, label, value in observations:
+                self.histograms[name][label].observe(value)
+            for name, label, value in increments:
+                self.counters[name][label] += value
+
+    def snapshot(self):
+        """Return ``({name: {label: Histogram}}, {name: {label: value}})``."""
+        with self._lock:
+            histograms = {name: dict(series) for name, series in self.histograms.items()}
+            counters = {name: dict(series) for name, series in self.counters.items()}
+        return histograms, counters
+
+    def render(self):
+        """Return everything in the Prometheus text exposition format."""
+        histograms, counters = self.snapshot()
+        lines = []
+        for name, series in sorted(histograms.items()):
+            lines += self._header(name, 'histogram')
+            for (label_name, label), histogram in sorted(series.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{name}_bucket{{{label_name}="{label}",le="{le}"}} {cumulative}')
+                lines.append(f'{name}_sum{{{label_name}="{label}"}} {histogram.sum:.6f}')
+                lines.append(f'{name}_count{{{label_name}="{label}"}} {histogram.count}')
+        for name, series in sorted(counters.items()):
+            lines += self._header(name, 'counter')
+            for (label_name, label), value in sorted(series.items()):
+                labels = f'{{{label_name}="{label}"}}' if label_name else ''
+                lines.append(f'{name}{labels} {int(value) if float(value).is_integer() else value}')
+        return '\n'.join(lines) + '\n'
+
+    def _header(self, name, kind):
+        header = [f'# TYPE {name} {kind}']
+        if name in HELP:
+            header.insert(0, f'# HELP {name} {HELP[name]}')
+        return header
+
+
+class RedisRegistry(Registry):
+    """
+    Metrics kept in Redis hashes, one per metric, so every web and Celery
+    worker process adds to the same numbers and any of them can render them.
+    """
+
+    PREFIX = 'events:metrics'
+
+    def __init__(self, url):
+        import redis
+
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+
+    def _key(self, kind, name):
+        return f'{self.PREFIX}:{kind}:{name}'
+
+    def record(self, observations=(), increments=()):
+        pipe = self._client.pipeline()
+        names = []
+        for name, label, value in observations:
+            key, label = self._key('histogram', name), json.dumps(label)
+            pipe.hincrby(key, f'{bisect_left(DURATION_BUCKETS, value)}:{label}', 1)
+            pipe.hincrbyfloat(key, f'sum:{label}', value)
+            pipe.hincrby(key, f'count:{label}', 1)
+            names.append(f'histogram:{name}')
+        for name, label, value in increments:
+            pipe.hincrbyfloat(self._key('counter', name), json.dumps(label), value)
+            names.append(f'counter:{name}')
+        if names:
+            pipe.sadd(f'{self.PREFIX}:names', *names)
+        try:
+            pipe.execute()
+        except Exception:
+            # Metrics are best-effort; never fail the request or task they describe
+            logger.warning("Could not record metrics", exc_info=True)
+
+    def snapshot(self):
+        names = sorted(self._client.smembers(f'{self.PREFIX}:names'))
+        pipe = self._client.pipeline(transaction=False)
+        for kind_name in names:
+            pipe.hgetall(self._key(*kind_name.split(':', 1)))
+        histograms, counters = {}, {}
+        for kind_name, fields in zip(names, pipe.execute()):
+            kind, name = kind_name.split(':', 1)
+            if kind == 'counter':
+                counters[name] = {tuple(json.loads(label)): float(value) for label, value in fields.items()}
+                continue
+            series = histograms[name] = defaultdict(Histogram)
+            for field, value in fields.items():
+                part, label = field.split(':', 1)
+                histogram = series[tuple(json.loads(label))]
+                if part == 'sum':
+                    histogram.sum = float(value)
+                elif part == 'count':
+                    histogram.count = int(value)
+                else:
+                    histogram.counts[int(part)] = int(value)
+        return histograms, counters
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            url = getattr(settings, 'METRICS_REDIS_URL', None)
+            _registry = RedisRegistry(url) if url else Registry()
+        return _registry
+
+
+class QueryTimer:
+    """``connection.execute_wrapper`` callable that counts and times SQL."""
+
+    def __init__(self, clock, keep_queries=False):
+        self.clock = clock
+        self.keep_queries = keep_queries
+        self.count = 0
+        self.duration = 0.0
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = self.clock()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = self.clock() - start
+            self.count += 1
+            self.duration += elapsed
+            if self.keep_queries:
+                self.queries.append((elapsed, sql))
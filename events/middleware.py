@@ -0,0 +1,103 @@
+import logging
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .metrics import QueryTimer, get_registry
+
+
+logger = logging.getLogger('events.slow_requests')
+
+# Timer of the async request being handled; sync_to_async carries it into the
+# worker threads where the ORM runs that request's queries
+_current_timer = ContextVar('events_query_timer', default=None)
+
+
+def _timed_execute(execute, sql, params, many, context):
+    timer = _current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+def _install_timed_execute():
+    # Connections are per thread, so this runs in the thread that will query;
+    # the wrapper stays put and times whichever request is current
+    for connection in connections.all():
+        if _timed_execute not in connection.execute_wrappers:
+            connection.execute_wrappers.append(_timed_execute)
+
+
+class MetricsMiddleware:
+    """
+    Record latency, SQL count/time and response size per URL name.
+    Removed from the stack entirely unless METRICS_ENABLED is set.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_threshold = getattr(settings, 'SLOW_REQUEST_THRESHOLD', None)
+        # Under ASGI stay on the event loop instead of forcing every request into a thread
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timer = QueryTimer(time.perf_counter, keep_queries=self.slow_threshold is not None)
+        start = time.perf_counter()
+        with self._timed_queries(timer):
+            response = self.get_response(request)
+        self._record(request, response, timer, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        timer = QueryTimer(time.perf_counter, keep_queries=self.slow_threshold is not None)
+        start = time.perf_counter()
+        token = _current_timer.set(timer)
+        try:
+            await sync_to_async(_install_timed_execute)()
+            response = await self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        # Recording may write to Redis; keep that off the event loop
+        await sync_to_async(self._record, thread_sensitive=False)(request, response, timer, time.perf_counter() - start)
+        return response
+
+    def _timed_queries(self, timer):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(timer))
+        return stack
+
+    def _record(self, request, response, timer, elapsed):
+        match = request.resolver_match
+        view = match.url_name if match and match.url_name else 'unmatched'
+        label = ('view', view)
+        increments = [
+            ('events_http_sql_queries_total', label, timer.count),
+            ('events_http_sql_duration_seconds_total', label, timer.duration),
+        ]
+        if not response.streaming:
+            increments.append(('events_http_response_bytes_total', label, len(response.content)))
+        get_registry().record(
+            observations=[('events_http_request_duration_seconds', label, elapsed)], increments=increments,
+        )
+
+        if self.slow_threshold is not None and elapsed >= self.slow_threshold:
+            top = sorted(timer.queries, reverse=True)[:getattr(settings, 'SLOW_REQUEST_TOP_QUERIES', 5)]
+            logger.warning(
+                "Slow request %s %s (%s): %.3fs, %d queries in %.3fs\n%s",
+                request.method, request.path, view, elapsed, timer.count, timer.duration,
+                '\n'.join(f"  {duration * 1000:.1f}ms {sql}" for duration, sql in top),
+            )
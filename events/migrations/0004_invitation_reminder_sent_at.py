@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-17 22:06
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def restore_sent_status(apps, schema_editor):
+    # send_reminder_email used to overwrite the RSVP with status='sent'
+    Invitation = apps.get_model('events', 'Invitation')
+    Invitation.objects.filter(status='sent').update(status='accepted', reminder_sent_at=F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_rename_token_invitation_uuid'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invitation',
+            name='reminder_sent_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(restore_sent_status, migrations.RunPython.noop),
+    ]
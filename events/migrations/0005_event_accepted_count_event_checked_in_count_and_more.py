@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-17 22:07
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_counters(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    Invitation = apps.get_model('events', 'Invitation')
+    counts = Invitation.objects.order_by().values('event_id').annotate(
+        accepted=Count('id', filter=Q(status='accepted')),
+        pending=Count('id', filter=Q(status='pending')),
+        declined=Count('id', filter=Q(status='declined')),
+        checked_in=Count('id', filter=Q(checked_in=True)),
+    )
+    for row in counts:
+        Event.objects.filter(pk=row['event_id']).update(
+            accepted_count=row['accepted'],
+            pending_count=row['pending'],
+            declined_count=row['declined'],
+            checked_in_count=row['checked_in'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_invitation_reminder_sent_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='accepted_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='checked_in_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='declined_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='pending_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
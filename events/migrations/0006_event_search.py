@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-17 22:11
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE INDEX events_event_search_vector_gin ON events_event USING gin (search_vector)"
+        )
+        schema_editor.execute(
+            "UPDATE events_event SET search_vector = "
+            "setweight(to_tsvector(COALESCE(title, '')), 'A') || "
+            "setweight(to_tsvector(COALESCE(location, '')), 'B') || "
+            "setweight(to_tsvector(COALESCE(description, '')), 'C')"
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE events_event_fts USING fts5(title, location, description)"
+        )
+        schema_editor.execute(
+            "INSERT INTO events_event_fts (rowid, title, location, description) "
+            "SELECT id, title, location, description FROM events_event"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS events_event_search_vector_gin")
+    elif vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS events_event_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0005_event_accepted_count_event_checked_in_count_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
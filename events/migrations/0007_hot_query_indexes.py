@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-17 22:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_event_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['is_public', 'end_date'], name='event_public_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['start_date'], name='event_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['created_by', 'start_date', 'id'], name='event_creator_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invitation',
+            index=models.Index(fields=['event', 'status', 'checked_in'], name='invitation_event_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invitation',
+            index=models.Index(fields=['event', 'created_at', 'id'], name='invitation_event_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invitation',
+            index=models.Index(fields=['event', 'updated_at'], name='invitation_event_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invitation',
+            index=models.Index(fields=['user', 'event'], name='invitation_user_event_idx'),
+        ),
+        # bulk_invite resolves guests with User.objects.filter(email__in=...); auth_user
+        # belongs to django.contrib.auth, so its index is created here
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS events_auth_user_email_idx ON auth_user (email)",
+            "DROP INDEX IF EXISTS events_auth_user_email_idx",
+        ),
+    ]
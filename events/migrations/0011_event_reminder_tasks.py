@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-17 22:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0010_emaildelivery'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='reminder_tasks',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='emaildelivery',
+            name='kind',
+            field=models.CharField(choices=[('invitation', 'Invitation'), ('reminder', 'Reminder (day before)'), ('reminder_2h', 'Reminder (2 hours before)')], max_length=20),
+        ),
+    ]
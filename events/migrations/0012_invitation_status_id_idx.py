@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 22:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0011_event_reminder_tasks'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invitation',
+            index=models.Index(fields=['status', 'id'], name='invitation_status_id_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-17 22:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0012_invitation_status_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RemovedInvitation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uuid', models.UUIDField()),
+                ('removed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='removed_invitations', to='events.event')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['event', 'removed_at'], name='removed_invitation_event_idx')],
+            },
+        ),
+    ]
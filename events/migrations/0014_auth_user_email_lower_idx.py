@@ -0,0 +1,17 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0013_removedinvitation'),
+    ]
+
+    operations = [
+        # bulk_invite matches guests to accounts on LOWER(email), which the plain
+        # events_auth_user_email_idx from 0007 can't serve
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS events_auth_user_email_lower_idx ON auth_user (LOWER(email))",
+            "DROP INDEX IF EXISTS events_auth_user_email_lower_idx",
+        ),
+    ]
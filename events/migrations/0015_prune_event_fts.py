@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+def prune_search_index(apps, schema_editor):
+    # Entries of events deleted before the post_delete receiver existed
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(
+            "DELETE FROM events_event_fts WHERE rowid NOT IN (SELECT id FROM events_event)"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0014_auth_user_email_lower_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(prune_search_index, migrations.RunPython.noop),
+    ]
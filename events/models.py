@@ -1,11 +1,14 @@
+import datetime
 import uuid
-import qrcode
-from io import BytesIO
-from django.db import models
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import models, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import Greatest
 from django.contrib.auth.models import User
-from django.core.files import File
 from django.utils import timezone
-from PIL import Image
+
+from . import caching, live
 
 class Event(models.Model):
     title = models.CharField(max_length=200)
@@ -19,9 +22,83 @@ class Event(models.Model):
     capacity = models.PositiveIntegerField(default=0)  # 0 means unlimited
     is_public = models.BooleanField(default=False)
     image = models.ImageField(upload_to='event_images/', blank=True, null=True)
+    # Resized WebP/JPEG copies of image and the hashes of the upload and source
+    # they were made from, written by the process_event_image task (see events.images)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    # Reminder tasks queued for this event, kind -> [start time they were
+    # timed for, Celery task id], kept by events.reminders
+    reminder_tasks = models.JSONField(default=dict, blank=True, editable=False)
+
+    # Denormalized invitation counters, kept in step by Invitation.save()/set_status()/delete()
+    # and release_counters() for bulk deletes, and repaired by the reconcile_event_counters
+    # management command
+    accepted_count = models.PositiveIntegerField(default=0, editable=False)
+    pending_count = models.PositiveIntegerField(default=0, editable=False)
+    declined_count = models.PositiveIntegerField(default=0, editable=False)
+    checked_in_count = models.PositiveIntegerField(default=0, editable=False)
+
+    COUNTER_FIELDS = ('accepted_count', 'pending_count', 'declined_count', 'checked_in_count')
+
+    # Postgres full-text index over title/location/description, refreshed in save();
+    # SQLite keeps an FTS5 table instead (see events.search and migration 0006)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # home and the public browse API: is_public = true AND end_date >= now
+            models.Index(fields=['is_public', 'end_date'], name='event_public_end_idx'),
+            # reminder sweep and browse date ranges
+            models.Index(fields=['start_date'], name='event_start_idx'),
+            # dashboard "events you created", newest first
+            models.Index(fields=['created_by', 'start_date', 'id'], name='event_creator_start_idx'),
+        ]
+
+    SEARCH_FIELDS = ('title', 'location', 'description')
+    SEARCH_VECTOR = (
+        SearchVector('title', weight='A')
+        + SearchVector('location', weight='B')
+        + SearchVector('description', weight='C')
+    )
     
     def __str__(self):
         return self.title
+
+    def save(self, *args, **kwargs):
+        # Never write back counters loaded earlier; they only move through adjust_counters().
+        # The same goes for fields maintained by background tasks.
+        if not self._state.adding and not kwargs.get('update_fields') and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS + ('search_vector', 'image_variants', 'reminder_tasks')
+            ]
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        text_changed = not update_fields or set(update_fields) & set(self.SEARCH_FIELDS)
+        if text_changed:
+            from .search import update_search_index
+            update_search_index(self, using=self._state.db)
+
+    @classmethod
+    def adjust_counters(cls, pk, **deltas):
+        updates = cls._counter_updates(deltas)
+        if updates:
+            cls.objects.filter(pk=pk).update(**updates)
+
+    @classmethod
+    async def aadjust_counters(cls, pk, **deltas):
+        updates = cls._counter_updates(deltas)
+        if updates:
+            await cls.objects.filter(pk=pk).aupdate(**updates)
+
+    @staticmethod
+    def _counter_updates(deltas):
+        updates = {}
+        for field, delta in deltas.items():
+            if delta > 0:
+                updates[field] = F(field) + delta
+            elif delta < 0:
+                updates[field] = Greatest(F(field) + delta, 0)
+        return updates
     
     @property
     def is_past(self):
@@ -29,7 +106,11 @@ class Event(models.Model):
     
     @property
     def attendee_count(self):
-        return self.invitations.filter(status='accepted').count()
+        return self.accepted_count
+
+    @property
+    def invitation_count(self):
+        return self.accepted_count + self.pending_count + self.declined_count
     
     @property
     def spots_left(self):
@@ -43,6 +124,7 @@ class Invitation(models.Model):
         ('accepted', 'Accepted'),
         ('declined', 'Declined'),
     ]
+    COUNTED_STATUSES = {'pending', 'accepted', 'declined'}
     
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='invitations')
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='invitations')
@@ -55,29 +137,244 @@ class Invitation(models.Model):
     qr_code = models.ImageField(upload_to='qr_codes/', blank=True, null=True)
     checked_in = models.BooleanField(default=False)
     checked_in_at = models.DateTimeField(null=True, blank=True)
+    reminder_sent_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
         unique_together = ['event', 'email']
+        indexes = [
+            # status counts, manifests, check-in and reminder lookups
+            models.Index(fields=['event', 'status', 'checked_in'], name='invitation_event_status_idx'),
+            # keyset pages of event_invitations, newest first
+            models.Index(fields=['event', 'created_at', 'id'], name='invitation_event_created_idx'),
+            # check-in manifest delta sync
+            models.Index(fields=['event', 'updated_at'], name='invitation_event_updated_idx'),
+            # dashboard "events you're invited to"
+            models.Index(fields=['user', 'event'], name='invitation_user_event_idx'),
+            # admin changelist filtered by status alone, newest first
+            models.Index(fields=['status', 'id'], name='invitation_status_id_idx'),
+        ]
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Remember what the event counters currently reflect for this row
+        self._counted_status = self.__dict__.get('status') if self.pk else None
+        self._counted_checked_in = self.__dict__.get('checked_in') if self.pk else False
+
     def __str__(self):
         return f"{self.name} - {self.event.title}"
-    
+
     def save(self, *args, **kwargs):
-        if not self.qr_code:
-            self.generate_qr_code()
-        super().save(*args, **kwargs)
-    
-    def generate_qr_code(self):
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self._sync_event_counters(self.status, self.checked_in)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            RemovedInvitation.objects.create(event_id=self.event_id, uuid=self.uuid)
+            result = super().delete(*args, **kwargs)
+            self._sync_event_counters(None, False)
+        # Done here rather than in a post_delete receiver; see events.signals
+        caching.invalidate_user(self.user_id)
+        return result
+
+    @classmethod
+    def release_counters(cls, invitations):
+        """
+        Take every invitation in the ``invitations`` queryset off its event's
+        counters; call before deleting them in bulk, which skips delete().
+        """
+        rows = invitations.order_by().values('event_id').annotate(
+            accepted_count=Count('id', filter=Q(status='accepted')),
+            pending_count=Count('id', filter=Q(status='pending')),
+            declined_count=Count('id', filter=Q(status='declined')),
+            checked_in_count=Count('id', filter=Q(checked_in=True)),
+        )
+        for row in rows:
+            event_id = row.pop('event_id')
+            deltas = {field: -count for field, count in row.items() if count}
+            Event.adjust_counters(event_id, **deltas)
+            live.publish_update(event_id, deltas)
+
+    def _sync_event_counters(self, status, checked_in):
+        deltas = {}
+        if status != self._counted_status:
+            if self._counted_status in self.COUNTED_STATUSES:
+                deltas[f'{self._counted_status}_count'] = -1
+            if status in self.COUNTED_STATUSES:
+                deltas[f'{status}_count'] = 1
+        if bool(checked_in) != bool(self._counted_checked_in):
+            deltas['checked_in_count'] = 1 if checked_in else -1
+        Event.adjust_counters(self.event_id, **deltas)
+        if deltas:
+            if status is None:
+                kind = 'removed'
+            elif self._counted_status is None:
+                kind = 'invited'
+            elif deltas.get('checked_in_count', 0) > 0:
+                kind = 'check_in'
+            else:
+                kind = 'rsvp'
+            live.publish_update(self.event_id, deltas, [live.guest_activity(kind, self)])
+        self._counted_status = status
+        self._counted_checked_in = checked_in
+
+    def set_status(self, status):
+        """
+        Move the invitation to ``status`` with conditional UPDATEs instead of a
+        full-row save. Accepting only succeeds while the event has a seat left;
+        returns False when it is full.
+        """
+        previous = self.status
+        if status == previous:
+            return True
+
+        with transaction.atomic():
+            now = timezone.now()
+            changed = Invitation.objects.filter(pk=self.pk, status=previous).update(status=status, updated_at=now)
+            if not changed:
+                # Another request changed this invitation first and did the counting
+                self.refresh_from_db(fields=['status', 'updated_at'])
+                self._counted_status = self.status
+                return self.status == status
+
+            events = Event.objects.filter(pk=self.event_id)
+            if status == 'accepted':
+                # Reserve the seat in the same statement that checks for one
+                events = events.filter(Q(capacity=0) | Q(accepted_count__lt=F('capacity')))
+            updates = {f'{status}_count': F(f'{status}_count') + 1}
+            if previous in self.COUNTED_STATUSES:
+                updates[f'{previous}_count'] = Greatest(F(f'{previous}_count') - 1, 0)
+            if not events.update(**updates):
+                transaction.set_rollback(True)
+                return False
+
+            self.status = status
+            self.updated_at = now
+            live.publish_update(
+                self.event_id,
+                {f'{status}_count': 1, f'{previous}_count': -1 if previous in self.COUNTED_STATUSES else 0},
+                [live.guest_activity('rsvp', self)],
+            )
+
+        self._counted_status = status
+        return True
+
+class RemovedInvitation(models.Model):
+    """
+    A deleted invitation's uuid, so check_in_manifest_delta() can tell
+    offline scanners to stop admitting the guest. Written by
+    Invitation.delete() and for querysets by RemovedInvitation.record().
+    """
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='removed_invitations')
+    uuid = models.UUIDField()
+    removed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # manifest delta sync
+            models.Index(fields=['event', 'removed_at'], name='removed_invitation_event_idx'),
+        ]
+
+    @classmethod
+    def record(cls, invitations):
+        """Record every invitation in the ``invitations`` queryset as removed; call before deleting them."""
+        cls.objects.bulk_create(
+            cls(event_id=event_id, uuid=invitation_uuid)
+            for event_id, invitation_uuid in invitations.values_list('event_id', 'uuid').iterator()
+        )
+
+class GuestImport(models.Model):
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    MAX_ERRORS = 1000  # per-row errors kept for display; the count keeps going
+
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='guest_imports')
+    uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='guest_imports')
+    file = models.FileField(upload_to='guest_imports/')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    total_rows = models.PositiveIntegerField(default=0)
+    processed_rows = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    skipped_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Import {self.pk} for {self.event.title}"
+
+    @property
+    def progress(self):
+        if self.status == 'done':
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(100, round(100 * self.processed_rows / self.total_rows))
+
+
+class EmailDelivery(models.Model):
+    """
+    One row per email a guest should get, so sends are idempotent: a task
+    only sends deliveries it claims, and a retry only claims the failures.
+    """
+    KIND_CHOICES = [
+        ('invitation', 'Invitation'),
+        ('reminder', 'Reminder (day before)'),
+        ('reminder_2h', 'Reminder (2 hours before)'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),      # temporary error; retried and picked up by resend_failed
+        ('rejected', 'Rejected'),  # permanent SMTP rejection; not retried
+    ]
+
+    invitation = models.ForeignKey(Invitation, on_delete=models.CASCADE, related_name='deliveries')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    provider_response = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('invitation', 'kind')
+        indexes = [
+            # resend_failed walks failures of one kind in id order
+            models.Index(fields=['status', 'kind', 'id'], name='delivery_status_kind_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} to {self.invitation.email}: {self.status}"
+
+    @classmethod
+    def claim(cls, invitations, kind):
+        """
+        Mark the ``kind`` deliveries for the ``invitations`` queryset that
+        still need sending as in flight and return them, creating rows on
+        first use. Sent mail and mail another worker is sending are left out;
+        a claim older than EMAIL_DELIVERY_CLAIM_TIMEOUT seconds counts as
+        abandoned.
+        """
+        invitation_ids = list(invitations.values_list('id', flat=True))
+        cls.objects.bulk_create(
+            [cls(invitation_id=invitation_id, kind=kind) for invitation_id in invitation_ids],
+            ignore_conflicts=True,
+        )
+        now = timezone.now()
+        abandoned = now - datetime.timedelta(seconds=getattr(settings, 'EMAIL_DELIVERY_CLAIM_TIMEOUT', 900))
+        deliveries = cls.objects.filter(invitation_id__in=invitation_ids, kind=kind)
+        deliveries.filter(
+            Q(status__in=('pending', 'failed')) | Q(status='sending', updated_at__lt=abandoned)
+        ).update(status='sending', attempts=F('attempts') + 1, updated_at=now)
+        return list(
+            deliveries.filter(status='sending', updated_at=now).select_related('invitation__event__created_by')
         )
-        qr.add_data(str(self.uuid))
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white")
-        buffer = BytesIO()
-        img.save(buffer, format="PNG")
-        self.qr_code.save(f"qr_{self.uuid}.png", File(buffer), save=False)
@@ -0,0 +1,96 @@
+import datetime
+import logging
+
+from celery import current_app
+from django.conf import settings
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+# EmailDelivery kind -> seconds before the event's start it is sent
+DEFAULT_OFFSETS = {'reminder': 24 * 60 * 60, 'reminder_2h': 2 * 60 * 60}
+
+
+def reminder_offsets():
+    """(kind, timedelta before start) for each configured reminder, earliest first."""
+    offsets = getattr(settings, 'REMINDER_OFFSETS', DEFAULT_OFFSETS)
+    return sorted(
+        ((kind, datetime.timedelta(seconds=seconds)) for kind, seconds in offsets.items()),
+        key=lambda item: item[1], reverse=True,
+    )
+
+
+def queue_horizon():
+    # Reminders are queued at most two sweeps ahead, keeping ETAs short enough
+    # that the broker never redelivers a task still waiting on its ETA
+    return datetime.timedelta(seconds=2 * getattr(settings, 'REMINDER_SWEEP_INTERVAL', 15 * 60))
+
+
+def start_key(event):
+    return event.start_date.astimezone(datetime.timezone.utc).isoformat()
+
+
+def due_reminders(event, now):
+    """
+    (kind, eta) for the reminders of ``event`` falling due within the queue
+    horizon. When some are already overdue (an event created or moved at
+    short notice) only the last one is sent, right away, and only if no
+    later reminder is still to come.
+    """
+    if event.start_date <= now:
+        return []
+    due = []
+    overdue = None
+    for kind, offset in reminder_offsets():
+        eta = event.start_date - offset
+        if eta <= now:
+            overdue = (kind, now)
+        elif eta <= now + queue_horizon():
+            due.append((kind, eta))
+    if overdue and overdue[0] == reminder_offsets()[-1][0]:
+        due.insert(0, overdue)
+    return due
+
+
+def queue_event_reminders(event, now=None):
+    """
+    Queue ``event``'s reminders that fall due soon and drop those queued for
+    a start time it no longer has. Reminders already queued for the current
+    start time are left alone, so this is safe to call on every save and
+    from every sweep.
+    """
+    from .models import EmailDelivery, Event
+    from .tasks import send_event_reminders
+
+    now = now or timezone.now()
+    start = start_key(event)
+    offsets = dict(reminder_offsets())
+    queued = dict(event.reminder_tasks or {})
+    changed = False
+
+    for kind, (queued_start, task_id) in list(queued.items()):
+        if queued_start == start:
+            continue
+        # The old task would find the start time changed and do nothing; revoking saves it the trip
+        try:
+            current_app.control.revoke(task_id)
+        except Exception:
+            logger.warning("Could not revoke reminder task %s", task_id, exc_info=True)
+        del queued[kind]
+        changed = True
+        # Guests reminded about the old time get reminded about the new one
+        if kind in offsets and event.start_date - offsets[kind] > now:
+            EmailDelivery.objects.filter(invitation__event_id=event.pk, kind=kind).delete()
+
+    for kind, eta in due_reminders(event, now):
+        if kind in queued:
+            continue
+        result = send_event_reminders.apply_async((event.pk, kind, start), eta=eta)
+        queued[kind] = [start, result.id]
+        changed = True
+
+    if changed:
+        Event.objects.filter(pk=event.pk).update(reminder_tasks=queued)
+        event.reminder_tasks = queued
+    return queued
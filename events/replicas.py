@@ -0,0 +1,132 @@
+import logging
+import random
+import time
+from contextvars import ContextVar
+from fnmatch import fnmatchcase
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.urls import Resolver404, resolve
+
+
+logger = logging.getLogger(__name__)
+
+# Replica alias the current request may read from; None reads from the primary
+_read_alias = ContextVar('events_read_alias', default=None)
+
+# alias -> time.monotonic() before which it is not tried again
+_down_until = {}
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+
+class ReplicaRouter:
+    """
+    Send reads to the replica ReplicaMiddleware picked for the request, and
+    everything else (writes, reads outside those requests, reads inside a
+    transaction, sessions and users) to the primary. Replicas get their
+    schema by replication, so migrations only run on the primary.
+    """
+
+    # A session row that hasn't replicated yet would look like an expired
+    # session, and SessionMiddleware would clear the cookie and log the user out
+    PRIMARY_APPS = {'sessions', 'auth'}
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None or model._meta.app_label in self.PRIMARY_APPS:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if _down_until.get(alias, 0) > time.monotonic():
+            return DEFAULT_DB_ALIAS
+        try:
+            connections[alias].ensure_connection()
+        except Exception:
+            # Fall back to the primary and leave the replica alone for a while
+            logger.warning("Replica %s unavailable, reading from the primary", alias, exc_info=True)
+            _down_until[alias] = time.monotonic() + getattr(settings, 'REPLICA_RETRY_AFTER', 30)
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaMiddleware:
+    """
+    Let GET/HEAD requests to REPLICA_READ_VIEWS (URL names, shell-style
+    patterns allowed) read from a replica. After a client's own POST (or any
+    unsafe method) a cookie pins it to the primary for REPLICA_PIN_SECONDS,
+    so it reads its own writes despite replication lag. Removed from the
+    stack when no replica is configured.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not replica_aliases():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.views = getattr(settings, 'REPLICA_READ_VIEWS', ())
+        self.pin_seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 10)
+        self.cookie_name = getattr(settings, 'REPLICA_PIN_COOKIE_NAME', 'pin_primary')
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _read_alias.set(self._read_alias(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+        return self._pin(request, response)
+
+    async def __acall__(self, request):
+        token = _read_alias.set(self._read_alias(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+        return self._pin(request, response)
+
+    def _read_alias(self, request):
+        if request.method not in ('GET', 'HEAD') or self._pinned(request):
+            return None
+        try:
+            view_name = resolve(request.path_info).view_name
+        except Resolver404:
+            return None
+        if not any(fnmatchcase(view_name, pattern) for pattern in self.views):
+            return None
+        now = time.monotonic()
+        healthy = [alias for alias in replica_aliases() if _down_until.get(alias, 0) <= now]
+        return random.choice(healthy) if healthy else None
+
+    def _pinned(self, request):
+        try:
+            return float(request.COOKIES.get(self.cookie_name, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def _pin(self, request, response):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE'):
+            response.set_cookie(
+                self.cookie_name, str(time.time() + self.pin_seconds),
+                max_age=self.pin_seconds, httponly=True, samesite='Lax',
+            )
+        return response
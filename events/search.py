@@ -0,0 +1,92 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+
+
+FTS_TABLE = 'events_event_fts'
+
+
+def update_search_index(event, using='default'):
+    """Refresh ``event``'s full-text entry after its text fields change."""
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        type(event).objects.using(using).filter(pk=event.pk).update(search_vector=event.SEARCH_VECTOR)
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [event.pk])
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, location, description) VALUES (%s, %s, %s, %s)",
+                [event.pk, event.title, event.location, event.description],
+            )
+
+
+def remove_from_search_index(event, using='default'):
+    """Drop a deleted ``event``'s full-text entry (Postgres keeps it on the row itself)."""
+    connection = connections[using]
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [event.pk])
+
+
+def rebuild_search_index(using='default'):
+    """Reindex every event, e.g. after rows were added with bulk_create()."""
+    from .models import Event
+
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        Event.objects.using(using).update(search_vector=Event.SEARCH_VECTOR)
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, location, description) "
+                f"SELECT id, title, location, description FROM events_event"
+            )
+
+
+def search_events(queryset, query):
+    """
+    Filter ``queryset`` to events matching ``query`` and order them by
+    relevance, using the Postgres GIN-indexed search vector or the SQLite
+    FTS5 table. Other backends fall back to substring matching.
+    """
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        search_query = SearchQuery(query, search_type='websearch')
+        return queryset.filter(search_vector=search_query).annotate(
+            rank=SearchRank(F('search_vector'), search_query)
+        ).order_by('-rank', 'start_date', 'id')
+
+    if vendor == 'sqlite':
+        match = _fts5_query(query)
+        if not match:
+            return queryset.none()
+        table = queryset.model._meta.db_table
+        # bm25() is lower-is-better, so negate it to rank like Postgres
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+        ).annotate(
+            rank=RawSQL(
+                f"SELECT -bm25({FTS_TABLE}, 10.0, 5.0, 1.0) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND rowid = {table}.id",
+                [match],
+            )
+        ).order_by('-rank', 'start_date', 'id')
+
+    terms = query.split()
+    condition = Q()
+    for term in terms:
+        condition &= Q(title__icontains=term) | Q(location__icontains=term) | Q(description__icontains=term)
+    return queryset.filter(condition).order_by('start_date', 'id')
+
+
+def _fts5_query(query):
+    # Quote each word so user input can't use (or break on) FTS5 query syntax;
+    # the last word matches as a prefix for search-as-you-type
+    words = re.findall(r'\w+', query)
+    if not words:
+        return ''
+    return ' '.join(f'"{word}"' for word in words) + '*'
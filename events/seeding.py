@@ -0,0 +1,87 @@
+import datetime
+import random
+
+from django.contrib.auth.models import User
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Event, Invitation
+from .search import rebuild_search_index
+
+
+# Rough shape of a real guest list: most guests answer, few decline
+STATUS_WEIGHTS = {'accepted': 55, 'pending': 30, 'declined': 15}
+
+
+def seed_dataset(users=100, events=20, invitations_per_event=200, check_in_rate=0.5,
+                 batch_size=2000, prefix='seed', seed=None):
+    """
+    Insert a synthetic dataset with bulk inserts and return the created
+    events. Guests are drawn from the seeded users; events are spread from a
+    month in the past to two months ahead, and past events get check-ins.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    run = f"{prefix}{rng.randrange(16 ** 8):08x}"
+
+    User.objects.bulk_create(
+        (User(username=f"{run}-user{i}", email=f"{run}-user{i}@example.com") for i in range(users)),
+        batch_size=batch_size,
+    )
+    seeded_users = list(User.objects.filter(username__startswith=f"{run}-user").only('id', 'email', 'username'))
+
+    new_events = []
+    for i in range(events):
+        start = now + datetime.timedelta(days=rng.randint(-30, 60), hours=rng.randint(8, 20))
+        new_events.append(Event(
+            title=f"Seeded event {i} {rng.choice(['Meetup', 'Conference', 'Workshop', 'Party', 'Launch'])}",
+            description=f"Synthetic event {i} created by seed_dataset for load testing.",
+            location=rng.choice(['Berlin', 'London', 'New York', 'Bangalore', 'Online']),
+            start_date=start,
+            end_date=start + datetime.timedelta(hours=rng.randint(1, 8)),
+            created_by=rng.choice(seeded_users),
+            is_public=rng.random() < 0.7,
+        ))
+    Event.objects.bulk_create(new_events, batch_size=batch_size)
+    seeded_events = list(Event.objects.filter(created_by__username__startswith=f"{run}-user").only('id', 'end_date'))
+
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+    invitations = []
+    for event in seeded_events:
+        guests = rng.sample(seeded_users, min(invitations_per_event, len(seeded_users)))
+        for guest in guests:
+            status = rng.choices(statuses, weights)[0]
+            checked_in = status == 'accepted' and event.end_date < now and rng.random() < check_in_rate
+            invitations.append(Invitation(
+                event=event,
+                user=guest,
+                email=guest.email,
+                name=guest.username,
+                status=status,
+                checked_in=checked_in,
+                checked_in_at=event.end_date if checked_in else None,
+            ))
+        if len(invitations) >= batch_size:
+            Invitation.objects.bulk_create(invitations, batch_size=batch_size)
+            invitations = []
+    Invitation.objects.bulk_create(invitations, batch_size=batch_size)
+
+    # bulk_create() skips save(), so fill in what it would have maintained
+    _recount(seeded_events, Invitation.objects.filter(event__created_by__username__startswith=f"{run}-user"))
+    rebuild_search_index()
+    return seeded_events
+
+
+def _recount(events, invitations):
+    counts = invitations.order_by().values('event_id').annotate(
+        accepted_count=Count('id', filter=Q(status='accepted')),
+        pending_count=Count('id', filter=Q(status='pending')),
+        declined_count=Count('id', filter=Q(status='declined')),
+        checked_in_count=Count('id', filter=Q(checked_in=True)),
+    )
+    by_event = {row.pop('event_id'): row for row in counts}
+    for event in events:
+        for field, value in by_event.get(event.pk, {}).items():
+            setattr(event, field, value)
+    Event.objects.bulk_update(events, Event.COUNTER_FIELDS, batch_size=1000)
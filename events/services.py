@@ -0,0 +1,273 @@
+import datetime
+import uuid
+from collections import namedtuple
+
+from celery import group
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import Case, DateTimeField, Max, Value, When
+from django.db.models.functions import Lower
+from django.utils.dateparse import parse_datetime
+from django.utils import timezone
+
+from . import caching, live
+from .models import Event, Invitation, RemovedInvitation
+from .pagination import decode_cursor, encode_cursor
+from .tasks import send_invitation_email_batch
+
+
+BulkInviteResult = namedtuple('BulkInviteResult', ['created', 'skipped', 'invitation_ids'])
+
+
+def bulk_invite_emails(event, emails, fallback_user, base_url, names=None, existing=None):
+    """
+    Invite every address in ``emails`` to ``event`` with a fixed number of
+    queries, however long the list is. ``base_url`` is the scheme and host
+    the emailed RSVP links are built on.
+
+    ``names`` optionally maps a lower-cased email to the guest's name.
+    Callers inviting in several chunks can pass ``existing``, the set of
+    lower-cased emails already on the event; it is kept up to date so the
+    event's guest list is only read once.
+    """
+    # Dedupe in memory, case-insensitively, keeping the first spelling seen
+    unique = {}
+    for email in emails:
+        email = email.strip()
+        if email:
+            unique.setdefault(email.lower(), email)
+
+    if existing is None:
+        existing = {
+            email.lower()
+            for email in Invitation.objects.filter(event=event).values_list('email', flat=True)
+        }
+    new_emails = [email for key, email in unique.items() if key not in existing]
+    skipped = len(emails) - len(new_emails)
+
+    if not new_emails:
+        return BulkInviteResult(created=0, skipped=skipped, invitation_ids=[])
+
+    # Resolve every known user in one query, matching emails case-insensitively
+    # like the dedupe above; the oldest account wins on duplicates
+    users = {}
+    accounts = User.objects.annotate(email_lower=Lower('email')).filter(
+        email_lower__in=[email.lower() for email in new_emails]
+    )
+    for user in accounts.order_by('-id'):
+        users[user.email_lower] = user
+
+    invitations = [
+        Invitation(
+            event=event,
+            user=users.get(email.lower(), fallback_user),
+            email=email,
+            name=(names or {}).get(email.lower()) or email.split('@')[0],  # Fall back to part of email as name
+        )
+        for email in new_emails
+    ]
+    # Rows lost to a concurrent invite are dropped by the (event, email) constraint
+    Invitation.objects.bulk_create(
+        invitations,
+        batch_size=getattr(settings, 'BULK_INVITE_BATCH_SIZE', 1000),
+        ignore_conflicts=True,
+    )
+
+    # bulk_create() can't report ids with ignore_conflicts, so match our uuids back
+    ours = {invitation.uuid for invitation in invitations}
+    inserted = {
+        invitation_uuid: invitation_id
+        for invitation_id, invitation_uuid in Invitation.objects.filter(
+            event=event, email__in=new_emails
+        ).values_list('id', 'uuid')
+        if invitation_uuid in ours
+    }
+    invitation_ids = list(inserted.values())
+    existing.update(email.lower() for email in new_emails)
+
+    Event.adjust_counters(event.pk, pending_count=len(invitation_ids))
+    live.publish_update(event.pk, {'pending_count': len(invitation_ids)}, (
+        live.guest_activity('invited', invitation) for invitation in invitations if invitation.uuid in inserted
+    ))
+    # bulk_create() sends no post_save signals, so drop the cached home pages here
+    caching.invalidate_all()
+
+    if invitation_ids:
+        chunk_size = getattr(settings, 'BULK_INVITE_EMAIL_CHUNK_SIZE', 100)
+        group(
+            send_invitation_email_batch.s(invitation_ids[start:start + chunk_size], base_url)
+            for start in range(0, len(invitation_ids), chunk_size)
+        ).apply_async()
+
+    return BulkInviteResult(
+        created=len(invitation_ids),
+        skipped=len(emails) - len(invitation_ids),
+        invitation_ids=invitation_ids,
+    )
+
+
+CHECK_IN_OK = 'ok'
+CHECK_IN_ALREADY = 'already_checked_in'
+CHECK_IN_NOT_ACCEPTED = 'not_accepted'
+CHECK_IN_UNKNOWN = 'unknown'
+
+CheckInResult = namedtuple('CheckInResult', ['uuid', 'outcome', 'name', 'checked_in_at'])
+
+
+def check_in_guests(event, uuids, scanned_at=None):
+    """
+    Check in every accepted guest of ``event`` in ``uuids`` with one
+    conditional UPDATE, so concurrent scanners can never check the same guest
+    in twice. Returns a CheckInResult per uuid, in the order given.
+
+    ``scanned_at`` optionally maps a uuid string to the time an offline
+    scanner saw the guest; it is recorded as ``checked_in_at`` instead of now.
+    """
+    parsed = _parse_uuids(uuids)
+    valid = {value for value in parsed.values() if value is not None}
+    now = timezone.now()
+
+    checked_in = 0
+    rows = {}
+    if valid:
+        checked_in = _pending_check_ins(event, valid).update(
+            checked_in=True, checked_in_at=_checked_in_at(parsed, scanned_at, now), updated_at=now,
+        )
+        Event.adjust_counters(event.pk, checked_in_count=checked_in)
+        for row in _check_in_rows(event, valid):
+            rows[row['uuid']] = row
+    results = _check_in_results(parsed, rows, checked_in, now)
+    if checked_in:
+        live.publish_update(event.pk, {'checked_in_count': checked_in}, _check_in_activity(results))
+    return results
+
+
+async def acheck_in_guests(event, uuids, scanned_at=None):
+    """check_in_guests() for async views: the same statements through the async ORM."""
+    parsed = _parse_uuids(uuids)
+    valid = {value for value in parsed.values() if value is not None}
+    now = timezone.now()
+
+    checked_in = 0
+    rows = {}
+    if valid:
+        checked_in = await _pending_check_ins(event, valid).aupdate(
+            checked_in=True, checked_in_at=_checked_in_at(parsed, scanned_at, now), updated_at=now,
+        )
+        await Event.aadjust_counters(event.pk, checked_in_count=checked_in)
+        async for row in _check_in_rows(event, valid):
+            rows[row['uuid']] = row
+    results = _check_in_results(parsed, rows, checked_in, now)
+    if checked_in:
+        await live.apublish_update(event.pk, {'checked_in_count': checked_in}, _check_in_activity(results))
+    return results
+
+
+def _check_in_activity(results):
+    return (
+        {'kind': 'check_in', 'uuid': result.uuid, 'name': result.name,
+         'status': 'accepted', 'checked_in_at': result.checked_in_at}
+        for result in results if result.outcome == CHECK_IN_OK
+    )
+
+
+def _parse_uuids(uuids):
+    parsed = {}
+    for value in uuids:
+        try:
+            parsed[str(value)] = uuid.UUID(str(value))
+        except ValueError:
+            parsed[str(value)] = None
+    return parsed
+
+
+def _checked_in_at(parsed, scanned_at, now):
+    if not scanned_at:
+        return Value(now)
+    return Case(
+        *[
+            When(uuid=parsed[value], then=Value(min(when, now)))
+            for value, when in scanned_at.items() if parsed.get(value)
+        ],
+        default=Value(now),
+        output_field=DateTimeField(),
+    )
+
+
+def _pending_check_ins(event, valid):
+    return Invitation.objects.filter(uuid__in=valid, event=event, status='accepted', checked_in=False)
+
+
+def _check_in_rows(event, valid):
+    return Invitation.objects.filter(uuid__in=valid, event=event).values(
+        'uuid', 'name', 'status', 'checked_in', 'checked_in_at', 'updated_at'
+    )
+
+
+def _check_in_results(parsed, rows, checked_in, now):
+    results = []
+    for value, invitation_uuid in parsed.items():
+        row = rows.get(invitation_uuid)
+        if row is None:
+            results.append(CheckInResult(value, CHECK_IN_UNKNOWN, None, None))
+        elif row['status'] != 'accepted':
+            results.append(CheckInResult(value, CHECK_IN_NOT_ACCEPTED, row['name'], None))
+        elif checked_in and row['updated_at'] == now:
+            results.append(CheckInResult(value, CHECK_IN_OK, row['name'], row['checked_in_at']))
+        else:
+            results.append(CheckInResult(value, CHECK_IN_ALREADY, row['name'], row['checked_in_at']))
+    return results
+
+
+def check_in_manifest(event):
+    """
+    Return the uuids of ``event``'s guests who may still enter, as sorted
+    packed 16-byte values, plus a cursor for check_in_manifest_delta().
+    """
+    invitations = Invitation.objects.filter(event=event)
+    # Take the cursor first so nothing changed during the read is missed
+    cursor = _manifest_cursor(event)
+    admissible = invitations.filter(status='accepted', checked_in=False)
+    packed = sorted(value.bytes for value in admissible.values_list('uuid', flat=True).iterator())
+    return b''.join(packed), cursor
+
+
+def check_in_manifest_delta(event, cursor):
+    """
+    Return the uuids that joined or left ``event``'s manifest since
+    ``cursor``, and a new cursor. Returns None for an unusable cursor, in
+    which case the device should download the full manifest again.
+    """
+    values = decode_cursor(cursor)
+    try:
+        since = parse_datetime(values[0]) if values and isinstance(values[0], str) else None
+    except ValueError:
+        # Well-formed but impossible, e.g. February 30th
+        since = None
+    if since is None:
+        return None
+
+    invitations = Invitation.objects.filter(event=event)
+    new_cursor = _manifest_cursor(event)
+    # Re-send a short overlap; rows committed late can carry an older updated_at
+    overlap = datetime.timedelta(seconds=getattr(settings, 'CHECK_IN_MANIFEST_OVERLAP', 5))
+    added, removed = [], []
+    changed = invitations.filter(updated_at__gte=since - overlap).values_list('uuid', 'status', 'checked_in')
+    for invitation_uuid, status, checked_in in changed.iterator():
+        if status == 'accepted' and not checked_in:
+            added.append(str(invitation_uuid))
+        else:
+            removed.append(str(invitation_uuid))
+    # Deleted invitations have no row left to change; their tombstones stand in
+    deleted = RemovedInvitation.objects.filter(event=event, removed_at__gte=since - overlap)
+    removed.extend(str(invitation_uuid) for invitation_uuid in deleted.values_list('uuid', flat=True).iterator())
+    return {'added': added, 'removed': removed, 'cursor': new_cursor}
+
+
+def _manifest_cursor(event):
+    # Deletions move the cursor on too, or every later delta would repeat them
+    changes = [
+        Invitation.objects.filter(event=event).aggregate(latest=Max('updated_at'))['latest'],
+        RemovedInvitation.objects.filter(event=event).aggregate(latest=Max('removed_at'))['latest'],
+    ]
+    return encode_cursor([max(filter(None, changes), default=None) or timezone.now()])
@@ -0,0 +1,78 @@
+import time
+
+from celery.signals import task_postrun, task_prerun
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import caching
+from .metrics import get_registry
+from .models import Event, Invitation, RemovedInvitation
+from .reminders import queue_event_reminders
+from .search import remove_from_search_index
+from .tasks import process_event_image
+
+
+@receiver([post_save, post_delete], sender=Event)
+def invalidate_home_for_event(sender, instance, **kwargs):
+    # Any event can appear on anyone's home page
+    caching.invalidate_all()
+
+
+@receiver(post_delete, sender=Event)
+def remove_event_from_search_index(sender, instance, using, **kwargs):
+    remove_from_search_index(instance, using=using)
+
+
+@receiver(post_save, sender=Event)
+def queue_event_image_variants(sender, instance, raw=False, **kwargs):
+    # Variants record the image they were made from, so a new upload (or a
+    # removed image) shows up as a mismatch
+    if raw or (instance.image.name or '') == instance.image_variants.get('source', ''):
+        return
+    event_id = instance.pk
+    transaction.on_commit(lambda: process_event_image.delay(event_id))
+
+
+@receiver(post_save, sender=Event)
+def reschedule_event_reminders(sender, instance, raw=False, **kwargs):
+    # Queues reminders now due and drops those timed for an old start date;
+    # a no-op for saves that don't move the event
+    if raw:
+        return
+    transaction.on_commit(lambda: queue_event_reminders(instance))
+
+
+# No post_delete here: a receiver would stop Django fast-deleting an event's
+# invitations on cascade, and the event's own post_delete already covers it.
+# Invitation.delete() invalidates the user's list for single deletes.
+@receiver(post_save, sender=Invitation)
+def invalidate_home_for_invitation(sender, instance, **kwargs):
+    # An invitation only changes the invited user's own list
+    caching.invalidate_user(instance.user_id)
+
+
+@receiver(pre_delete, sender=User)
+def release_invitations_of_deleted_user(sender, instance, **kwargs):
+    # The user's invitations go by cascade, which skips Invitation.delete();
+    # receiving on User keeps that cascade a fast delete
+    invitations = Invitation.objects.filter(user=instance)
+    RemovedInvitation.record(invitations)
+    Invitation.release_counters(invitations)
+
+
+_task_started = {}
+
+
+@task_prerun.connect
+def start_task_timer(task_id=None, task=None, **kwargs):
+    if task.name.startswith('events.tasks.'):
+        _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def record_task_runtime(task_id=None, task=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        get_registry().observe('events_celery_task_duration_seconds', ('task', task.name), time.perf_counter() - started)
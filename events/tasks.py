@@ -1,103 +1,394 @@
-from celery import shared_task
-from django.core.mail import send_mail
+from celery import shared_task, group
+from django.core.exceptions import ValidationError
+from django.core.mail import get_connection, EmailMessage
+from django.core.validators import validate_email
+from django.db.models import F, Q
+from django.urls import reverse
 from django.utils import timezone
+from django.utils.timesince import timeuntil
 from django.conf import settings
-import datetime
+import csv
+import io
+import itertools
+import smtplib
 
+from . import throttle
 
 
-@shared_task
-def send_invitation_email(invitation_id, invitation_url):
-    from .models import Invitation
-    try:
-        invitation = Invitation.objects.get(id=invitation_id)
-        event = invitation.event
-        
-        subject = f"You're invited to {event.title}"
+
+def invitation_email_builder(event):
+    """
+    Format the per-event parts of the invitation email once and return a
+    function that fills in the per-guest parts.
+    """
+    subject = f"You're invited to {event.title}"
+    intro = f"You have been invited to {event.title} by {event.created_by.username}."
+    details = _event_details(event)
+
+    def build(invitation, invitation_url):
         message = f"""
         Hello {invitation.name},
-        
-        You have been invited to {event.title} by {event.created_by.username}.
-        
-        Event Details:
-        - Date: {event.start_date.strftime('%A, %B %d, %Y')}
-        - Time: {event.start_date.strftime('%I:%M %p')} - {event.end_date.strftime('%I:%M %p')}
-        - Location: {event.location}
-        
+
+        {intro}
+
+        {details}
+
         Please RSVP by clicking the link below:
         {invitation_url}
-        
+
         We hope to see you there!
         """
-        
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [invitation.email],
-            fail_silently=False,
-        )
-        
-        return f"Invitation email sent to {invitation.email}"
-    
-    except Exception as e:
-        print(f"Error sending invitation email: {str(e)}")
-        return f"Error sending invitation email: {str(e)}"
+        return subject, message
 
-@shared_task
-def send_reminder_email(invitation_id):
-    from .models import Invitation
-    
-    try:
-        invitation = Invitation.objects.get(id=invitation_id, status='accepted')
-        event = invitation.event
-        
-        subject = f"Reminder: {event.title} is tomorrow"
+    return build
+
+def reminder_email_builder(event):
+    # Worded from the actual time left, since overdue reminders go out late
+    starts_in = timeuntil(event.start_date, depth=1).replace('\xa0', ' ')
+    subject = f"Reminder: {event.title} starts in {starts_in}"
+    details = _event_details(event)
+
+    def build(invitation):
         message = f"""
         Hello {invitation.name},
-        
-        This is a friendly reminder that {event.title} is tomorrow!
-        
-        Event Details:
-        - Date: {event.start_date.strftime('%A, %B %d, %Y')}
-        - Time: {event.start_date.strftime('%I:%M %p')} - {event.end_date.strftime('%I:%M %p')}
-        - Location: {event.location}
-        
+
+        This is a friendly reminder that {event.title} starts in {starts_in}!
+
+        {details}
+
         Your QR code for check-in is attached to this email.
-        
+
         We look forward to seeing you!
         """
-        
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [invitation.email],
-            fail_silently=False,
-        )
-        invitation.status = 'sent'
-        invitation.save()
-        return f"Reminder email sent to {invitation.email}"
-    
+        return subject, message
+
+    return build
+
+def _event_details(event):
+    return f"""Event Details:
+        - Date: {event.start_date.strftime('%A, %B %d, %Y')}
+        - Time: {event.start_date.strftime('%I:%M %p')} - {event.end_date.strftime('%I:%M %p')}
+        - Location: {event.location}"""
+
+# Connection drops, timeouts and SMTP errors (smtplib.SMTPException is an
+# OSError) are worth retrying; permanent rejections are recorded instead.
+TRANSIENT_EMAIL_ERRORS = (OSError,)
+
+# Retry after ~30s, 60s, 120s... up to 30 minutes, jittered so a provider
+# outage doesn't bring every task back at the same instant
+EMAIL_RETRY = {
+    'autoretry_for': TRANSIENT_EMAIL_ERRORS,
+    'retry_backoff': 30,
+    'retry_backoff_max': 1800,
+    'retry_jitter': True,
+    'max_retries': 6,
+}
+
+def deliver(deliveries, messages, chunk_size=None, paced=True):
+    """
+    Send ``messages``, one per claimed EmailDelivery in ``deliveries``, over
+    one connection ``chunk_size`` at a time and record each outcome. Bulk
+    mail is paced by the bulk mail token bucket. Permanent rejections are
+    recorded and skipped; any other error marks the unsent rest failed and is
+    re-raised, so a retry resends only those.
+    """
+    from .models import EmailDelivery
+
+    chunk_size = chunk_size or getattr(settings, 'EMAIL_BATCH_SIZE', 100)
+    bucket = throttle.bulk_mail_bucket() if paced else None
+    connection = get_connection(fail_silently=False)
+    pending = list(zip(deliveries, messages))
+    sent = 0
+    try:
+        connection.open()
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            if bucket is not None:
+                bucket.acquire(len(chunk))
+            sent_ids, rejected = [], []
+            try:
+                for delivery, message in chunk:
+                    try:
+                        connection.send_messages([message])
+                    except smtplib.SMTPException as e:
+                        if not _permanent_rejection(e):
+                            raise
+                        rejected.append((delivery.id, e))
+                    else:
+                        sent_ids.append(delivery.id)
+            finally:
+                # Record what went out before any error propagates
+                now = timezone.now()
+                EmailDelivery.objects.filter(id__in=sent_ids).update(
+                    status='sent', sent_at=now, last_error='', provider_response='', updated_at=now,
+                )
+                for delivery_id, e in rejected:
+                    EmailDelivery.objects.filter(id=delivery_id).update(
+                        status='rejected', last_error=str(e), provider_response=_smtp_reply(e), updated_at=now,
+                    )
+            sent += len(sent_ids)
     except Exception as e:
-        return f"Error sending reminder email: {str(e)}"
+        EmailDelivery.objects.filter(id__in=[d.id for d in deliveries], status='sending').update(
+            status='failed', last_error=str(e), provider_response=_smtp_reply(e), updated_at=timezone.now(),
+        )
+        raise
+    finally:
+        connection.close()
+    return sent
 
-@shared_task
-def schedule_reminders():
+def _permanent_rejection(error):
+    """True for a 5xx reply about this message, which no retry will fix."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    # A refused sender is a configuration problem affecting every message
+    return isinstance(error, smtplib.SMTPDataError) and error.smtp_code >= 500
+
+def _smtp_reply(error):
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return '; '.join(f"{address}: {code} {_decode(reply)}" for address, (code, reply) in error.recipients.items())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return f"{error.smtp_code} {_decode(error.smtp_error)}"
+    return ''
+
+def _decode(reply):
+    return reply.decode(errors='replace') if isinstance(reply, bytes) else str(reply)
+
+def _invitation_messages(deliveries, base_url):
+    builders = {}
+    messages = []
+    for delivery in deliveries:
+        invitation = delivery.invitation
+        if invitation.event_id not in builders:
+            builders[invitation.event_id] = invitation_email_builder(invitation.event)
+        invitation_url = base_url.rstrip('/') + reverse('rsvp', kwargs={'uuid': invitation.uuid})
+        subject, message = builders[invitation.event_id](invitation, invitation_url)
+        messages.append(EmailMessage(subject, message, settings.DEFAULT_FROM_EMAIL, [invitation.email]))
+    return messages
+
+def _reminder_messages(deliveries):
+    builders = {}
+    messages = []
+    for delivery in deliveries:
+        invitation = delivery.invitation
+        if invitation.event_id not in builders:
+            builders[invitation.event_id] = reminder_email_builder(invitation.event)
+        subject, message = builders[invitation.event_id](invitation)
+        messages.append(EmailMessage(subject, message, settings.DEFAULT_FROM_EMAIL, [invitation.email]))
+    return messages
+
+def _reminders_due(invitation_ids):
+    from .models import Invitation
+    return Invitation.objects.filter(id__in=invitation_ids, status='accepted')
+
+def _mark_reminded(deliveries, kind):
+    # reminder_sent_at records the latest reminder; the ledger has each one
+    from .models import Invitation
+    Invitation.objects.filter(
+        id__in=[delivery.invitation_id for delivery in deliveries],
+        deliveries__kind=kind,
+        deliveries__status='sent',
+    ).update(reminder_sent_at=timezone.now())
+
+@shared_task(ignore_result=True, **EMAIL_RETRY)
+def send_invitation_email(invitation_id, invitation_url):
+    from .models import EmailDelivery, Invitation
+
+    deliveries = EmailDelivery.claim(Invitation.objects.filter(id=invitation_id), 'invitation')
+    if not deliveries:
+        return f"Invitation {invitation_id} already sent or being sent"
+    invitation = deliveries[0].invitation
+    subject, message = invitation_email_builder(invitation.event)(invitation, invitation_url)
+    deliver(deliveries, [EmailMessage(subject, message, settings.DEFAULT_FROM_EMAIL, [invitation.email])], paced=False)
+    return f"Invitation email sent to {invitation.email}"
+
+@shared_task(ignore_result=True, **EMAIL_RETRY)
+def send_invitation_email_batch(invitation_ids, base_url, chunk_size=None):
+    """
+    Send invitation emails for ``invitation_ids`` over a single connection.
+    RSVP links are built as ``base_url`` + the ``rsvp`` URL path. Guests
+    already sent this invitation are skipped, so the task is safe to retry.
+    """
+    from .models import EmailDelivery, Invitation
+
+    deliveries = EmailDelivery.claim(Invitation.objects.filter(id__in=invitation_ids), 'invitation')
+    sent = deliver(deliveries, _invitation_messages(deliveries, base_url), chunk_size)
+    return f"Invitation emails sent to {sent} guests"
+
+@shared_task(ignore_result=True, **EMAIL_RETRY)
+def send_reminder_email(invitation_id, kind='reminder'):
+    from .models import EmailDelivery
+
+    deliveries = EmailDelivery.claim(_reminders_due([invitation_id]), kind)
+    if not deliveries:
+        return f"Reminder for invitation {invitation_id} not due, already sent or being sent"
+    try:
+        deliver(deliveries, _reminder_messages(deliveries), paced=False)
+    finally:
+        _mark_reminded(deliveries, kind)
+    return f"Reminder email sent to {deliveries[0].invitation.email}"
+
+@shared_task(ignore_result=True, **EMAIL_RETRY)
+def send_reminder_email_batch(invitation_ids, chunk_size=None, kind='reminder'):
+    from .models import EmailDelivery
+
+    # The claim stops a duplicate task or a retry from sending twice
+    deliveries = EmailDelivery.claim(_reminders_due(invitation_ids), kind)
+    try:
+        sent = deliver(deliveries, _reminder_messages(deliveries), chunk_size)
+    finally:
+        _mark_reminded(deliveries, kind)
+    return f"Reminder emails sent to {sent} guests"
+
+@shared_task(ignore_result=True)
+def send_event_reminders(event_id, kind, start_date):
+    """
+    Send an event's ``kind`` reminders to its accepted guests in batches.
+    Queued with an ETA by events.reminders; does nothing if the event has
+    since moved from ``start_date``, as a task for the new time replaces it.
+    """
     from .models import Event, Invitation
-    
-    # Get events happening tomorrow
-    tomorrow = timezone.now().date() + datetime.timedelta(days=1)
-    events = Event.objects.filter(
-        start_date__date=tomorrow,
-        end_date__gte=timezone.now()
+    from .reminders import start_key
+
+    event = Event.objects.filter(id=event_id).only('id', 'start_date').first()
+    if event is None or start_key(event) != start_date:
+        return f"Reminders for event {event_id} at {start_date} are no longer due"
+
+    invitation_ids = list(
+        Invitation.objects.filter(event_id=event_id, status='accepted').order_by('id').values_list('id', flat=True)
     )
-    
-    for event in events:
-        # Get accepted invitations
-        invitations = Invitation.objects.filter(event=event, status='accepted')
-        
-        for invitation in invitations:
-            send_reminder_email.delay(invitation.id)
-    
-    return f"Scheduled reminders for {len(events)} events"
+    chunk_size = getattr(settings, 'REMINDER_BATCH_SIZE', 500)
+    group(
+        send_reminder_email_batch.s(invitation_ids[start:start + chunk_size], kind=kind)
+        for start in range(0, len(invitation_ids), chunk_size)
+    ).apply_async()
+    return f"Queued {kind} for {len(invitation_ids)} guests of event {event_id}"
+
+@shared_task(ignore_result=True)
+def schedule_reminders():
+    """
+    Queue the reminders falling due before the next sweep or two, plus any
+    missed. Beat runs this every REMINDER_SWEEP_INTERVAL; the ETAs it sets,
+    not the sweep, decide when mail goes out.
+    """
+    from .models import Event
+    from .reminders import queue_event_reminders, queue_horizon, reminder_offsets
+
+    offsets = reminder_offsets()
+    if not offsets:
+        return "No reminders configured"
+    now = timezone.now()
+    events = Event.objects.filter(
+        start_date__gt=now, start_date__lte=now + offsets[0][1] + queue_horizon(),
+    ).only('id', 'start_date', 'reminder_tasks').order_by('start_date')
+
+    count = 0
+    for event in events.iterator():
+        queue_event_reminders(event, now)
+        count += 1
+    return f"Checked reminders for {count} events"
+
+@shared_task(ignore_result=True)
+def import_guests(import_id, base_url):
+    """
+    Invite the guests listed in a GuestImport's CSV (``email`` and optional
+    ``name`` columns; others are ignored), reading the file from storage
+    and inviting IMPORT_CHUNK_SIZE rows at a time.
+    """
+    from .models import GuestImport, Invitation
+    from .services import bulk_invite_emails
+
+    guest_import = GuestImport.objects.select_related('event', 'event__created_by').get(id=import_id)
+    event = guest_import.event
+    imports = GuestImport.objects.filter(id=import_id)
+    chunk_size = getattr(settings, 'IMPORT_CHUNK_SIZE', 1000)
+
+    errors = []
+    try:
+        with guest_import.file.open('rb') as f:
+            # Records, not lines: quoted fields can span lines and DictReader skips blank ones
+            records = csv.reader(io.TextIOWrapper(f, encoding='utf-8-sig', newline=''))
+            total = max(0, sum(1 for row in records if row) - 1)
+        imports.update(status='running', total_rows=total, updated_at=timezone.now())
+
+        existing = {email.lower() for email in Invitation.objects.filter(event=event).values_list('email', flat=True)}
+        error_count = 0
+        with guest_import.file.open('rb') as f:
+            reader = csv.DictReader(io.TextIOWrapper(f, encoding='utf-8-sig', newline=''))
+            columns = {(name or '').strip().lower(): name for name in reader.fieldnames or []}
+            if 'email' not in columns:
+                raise ValueError("The CSV needs an 'email' column.")
+
+            rows = enumerate(reader, start=2)  # row 1 is the header
+            while True:
+                chunk = list(itertools.islice(rows, chunk_size))
+                if not chunk:
+                    break
+
+                emails, names = [], {}
+                for line, row in chunk:
+                    email = (row.get(columns['email']) or '').strip()
+                    try:
+                        validate_email(email)
+                    except ValidationError:
+                        error_count += 1
+                        if len(errors) < GuestImport.MAX_ERRORS:
+                            errors.append({'row': line, 'email': email, 'error': "Invalid email address"})
+                        continue
+                    emails.append(email)
+                    name = (row.get(columns.get('name')) or '').strip() if 'name' in columns else ''
+                    if name:
+                        # The first row for an address wins, as in bulk_invite_emails()
+                        names.setdefault(email.lower(), name[:100])
+
+                result = bulk_invite_emails(
+                    event, emails, fallback_user=event.created_by, base_url=base_url,
+                    names=names, existing=existing,
+                )
+                imports.update(
+                    processed_rows=F('processed_rows') + len(chunk),
+                    created_count=F('created_count') + result.created,
+                    skipped_count=F('skipped_count') + result.skipped,
+                    error_count=error_count,
+                    errors=errors,
+                    updated_at=timezone.now(),
+                )
+
+        imports.update(status='done', updated_at=timezone.now())
+        return f"Imported guests for {event.title}"
+
+    except Exception as e:
+        imports.update(
+            status='failed',
+            errors=[{'row': None, 'email': '', 'error': str(e)}] + errors,
+            updated_at=timezone.now(),
+        )
+        return f"Error importing guests: {str(e)}"
+
+@shared_task(ignore_result=True)
+def process_event_image(event_id):
+    """Strip EXIF from an event's image and build its resized variants."""
+    from .images import VARIANT_FORMATS, build_variants, delete_variants
+    from .models import Event
+
+    event = Event.objects.only('id', 'image', 'image_variants').filter(id=event_id).first()
+    if event is None:
+        return f"Event {event_id} was deleted"
+    source, previous = event.image.name, event.image_variants
+    variants = build_variants(event)
+    if variants is None:
+        return f"Image variants for event {event_id} are up to date"
+
+    # Leave the row alone if a newer upload replaced the image meanwhile
+    if source:
+        updated = Event.objects.filter(id=event_id, image=source).update(
+            image=event.image.name, image_variants=variants,
+        )
+    else:
+        updated = Event.objects.filter(Q(image='') | Q(image__isnull=True), id=event_id).update(
+            image_variants=variants,
+        )
+    if not updated:
+        # Anything the row still points at stays, including reused variants
+        delete_variants(event.image.storage, variants, keep=previous)
+        return f"Image for event {event_id} changed during processing"
+    return f"Built {sum(len(variants.get(key, ())) for key in VARIANT_FORMATS)} image variants for event {event_id}"
@@ -0,0 +1,35 @@
+from django import template
+from django.utils.html import format_html
+
+from events.images import VARIANT_FORMATS, srcset
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def event_image(event, sizes='100vw', css_class='', loading='lazy'):
+    """
+    Responsive ``<picture>`` for ``event.image``: WebP and JPEG ``srcset``s
+    once the variants are built, the original until then.
+    """
+    if not event.image:
+        return ''
+    jpeg = srcset(event, 'jpeg')
+    if not jpeg:
+        return format_html(
+            '<img src="{}" class="{}" alt="{}" loading="{}">',
+            event.image.url, css_class, event.title, loading,
+        )
+
+    variants = event.image_variants
+    # Browsers without srcset get the first copy at least 640px wide
+    fallback = next((name for width, name in variants['jpeg'] if width >= 640), variants['jpeg'][-1][1])
+    sources = format_html(
+        '<source type="{}" srcset="{}" sizes="{}">',
+        VARIANT_FORMATS['webp'][1], srcset(event, 'webp'), sizes,
+    )
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" class="{}" alt="{}" loading="{}"></picture>',
+        sources, event.image.storage.url(fallback), jpeg, sizes, css_class, event.title, loading,
+    )
@@ -0,0 +1,52 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import EmailDelivery, Event, Invitation
+
+
+@override_settings(REPLICA_READ_VIEWS=[])
+class InvitationAdminActionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'secret')
+        start = timezone.now() + datetime.timedelta(days=30)
+        cls.event = Event.objects.create(
+            title="Launch", description="", location="Hall", created_by=cls.admin,
+            start_date=start, end_date=start + datetime.timedelta(hours=3),
+        )
+        cls.invitation = Invitation.objects.create(
+            event=cls.event, user=cls.admin, email='guest@example.com', name="Guest",
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def _action(self, action):
+        return self.client.post(reverse('admin:events_invitation_changelist'), {
+            'action': action, '_selected_action': [self.invitation.pk],
+        })
+
+    def test_resend_invitation_keeps_delivery_history(self):
+        EmailDelivery.objects.create(
+            invitation=self.invitation, kind='invitation', status='failed', attempts=3,
+            last_error="Connection unexpectedly closed",
+        )
+        self._action('resend_invitation')
+
+        delivery = EmailDelivery.objects.get(invitation=self.invitation, kind='invitation')
+        self.assertEqual(delivery.status, 'sent')
+        self.assertEqual(delivery.attempts, 4)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_resend_invitation_sends_already_sent_invitations_again(self):
+        EmailDelivery.objects.create(invitation=self.invitation, kind='invitation', status='sent', attempts=1)
+        self._action('resend_invitation')
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(EmailDelivery.objects.get(invitation=self.invitation, kind='invitation').attempts, 2)
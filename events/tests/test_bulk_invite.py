@@ -0,0 +1,29 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from events.services import bulk_invite_emails
+
+
+class BulkInviteEmailsTests(TestCase):
+
+    def setUp(self):
+        self.organizer = User.objects.create_user('organizer', 'organizer@example.com')
+        start = timezone.now() + datetime.timedelta(days=30)
+        self.event = self.organizer.created_events.create(
+            title="Launch", description="", location="Hall",
+            start_date=start, end_date=start + datetime.timedelta(hours=3),
+        )
+
+    def test_links_existing_accounts_whatever_the_email_case(self):
+        bob = User.objects.create_user('bob', 'bob@x.com')
+        result = bulk_invite_emails(
+            self.event, ['Bob@X.com', 'bob@x.com', 'new@x.com'], fallback_user=self.organizer,
+            base_url='http://testserver/',
+        )
+
+        self.assertEqual((result.created, result.skipped), (2, 1))
+        invitations = dict(self.event.invitations.values_list('email', 'user'))
+        self.assertEqual(invitations, {'Bob@X.com': bob.pk, 'new@x.com': self.organizer.pk})
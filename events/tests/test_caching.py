@@ -0,0 +1,43 @@
+import datetime
+
+from django.contrib.admin.sites import site
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from events.admin import InvitationAdmin
+from events.models import Event, Invitation
+
+
+@override_settings(REPLICA_READ_VIEWS=[])
+class HomeCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.organizer = User.objects.create_user('organizer', password='secret')
+        self.guest = User.objects.create_user('guest', password='secret')
+        start = timezone.now() + datetime.timedelta(days=1)
+        self.event = Event.objects.create(
+            title="Private dinner", description="", location="Hall", created_by=self.organizer,
+            start_date=start, end_date=start + datetime.timedelta(hours=3), is_public=False,
+        )
+        self.invitation = Invitation.objects.create(
+            event=self.event, user=self.guest, email='guest@example.com', name="Guest",
+        )
+        self.client.force_login(self.guest)
+
+    def _home_titles(self):
+        return [event.title for event in self.client.get(reverse('home')).context['upcoming_events']]
+
+    def test_deleting_invitation_drops_event_from_cached_home(self):
+        self.assertEqual(self._home_titles(), ["Private dinner"])
+        self.invitation.delete()
+        self.assertEqual(self._home_titles(), [])
+
+    def test_admin_delete_drops_event_from_cached_home(self):
+        self.assertEqual(self._home_titles(), ["Private dinner"])
+        request = RequestFactory().post('/')
+        InvitationAdmin(Invitation, site).delete_queryset(request, Invitation.objects.filter(pk=self.invitation.pk))
+        self.assertEqual(self._home_titles(), [])
@@ -0,0 +1,92 @@
+import datetime
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import Event, Invitation
+from events.pagination import encode_cursor
+
+
+@override_settings(REPLICA_READ_VIEWS=[])
+class OfflineCheckInTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user('organizer', password='secret')
+        start = timezone.now() + datetime.timedelta(hours=1)
+        cls.event = Event.objects.create(
+            title="Launch", description="", location="Hall", created_by=cls.organizer,
+            start_date=start, end_date=start + datetime.timedelta(hours=3),
+        )
+        cls.guest = Invitation.objects.create(
+            event=cls.event, user=cls.organizer, email='guest@example.com', name="Guest", status='accepted',
+        )
+
+    def setUp(self):
+        self.client.force_login(self.organizer)
+
+    def _upload(self, scans):
+        return self.client.post(
+            reverse('check_in_upload', args=[self.event.pk]), json.dumps({'scans': scans}),
+            content_type='application/json',
+        )
+
+    def _delta(self, cursor):
+        return self.client.get(reverse('check_in_manifest_delta', args=[self.event.pk]), {'cursor': cursor})
+
+    def test_upload_checks_in_scanned_guest(self):
+        response = self._upload([{'uuid': str(self.guest.uuid), 'scanned_at': '2020-02-28T10:00:00+00:00'}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['checked_in'], 1)
+
+    def test_upload_rejects_impossible_scanned_at(self):
+        response = self._upload([{'uuid': str(self.guest.uuid), 'scanned_at': '2020-02-30T10:00:00'}])
+        self.assertEqual(response.status_code, 400)
+        self.guest.refresh_from_db()
+        self.assertFalse(self.guest.checked_in)
+
+    def test_upload_rejects_unreadable_scanned_at(self):
+        response = self._upload([{'uuid': str(self.guest.uuid), 'scanned_at': 'garbage'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(self.guest.uuid), response.json()['error'])
+        self.guest.refresh_from_db()
+        self.assertFalse(self.guest.checked_in)
+
+    def test_upload_without_scanned_at_checks_in_now(self):
+        response = self._upload([{'uuid': str(self.guest.uuid)}])
+        self.assertEqual(response.json()['checked_in'], 1)
+        self.guest.refresh_from_db()
+        self.assertLess(timezone.now() - self.guest.checked_in_at, datetime.timedelta(minutes=1))
+
+    def test_delta_with_impossible_cursor_date_is_gone(self):
+        response = self._delta(encode_cursor(['2020-02-30T10:00:00+00:00']))
+        self.assertEqual(response.status_code, 410)
+
+    def test_delta_with_garbled_cursor_is_gone(self):
+        self.assertEqual(self._delta('not-a-cursor').status_code, 410)
+
+    def test_delta_lists_deleted_invitations_as_removed(self):
+        cursor = self._delta_cursor()
+        self.guest.delete()
+        response = self._delta(cursor)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['removed'], [str(self.guest.uuid)])
+
+    def test_delta_lists_invitations_deleted_in_admin_as_removed(self):
+        cursor = self._delta_cursor()
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'secret')
+        self.client.force_login(admin)
+        self.client.post(reverse('admin:events_invitation_changelist'), {
+            'action': 'delete_selected', '_selected_action': [self.guest.pk], 'post': 'yes',
+        })
+        self.assertFalse(Invitation.objects.filter(pk=self.guest.pk).exists())
+
+        self.client.force_login(self.organizer)
+        self.assertEqual(self._delta(cursor).json()['removed'], [str(self.guest.uuid)])
+
+    def _delta_cursor(self):
+        response = self.client.get(reverse('check_in_manifest', args=[self.event.pk]))
+        return response['X-Manifest-Cursor']
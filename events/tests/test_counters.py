@@ -0,0 +1,74 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import Event, Invitation, RemovedInvitation
+
+
+@override_settings(REPLICA_READ_VIEWS=[])
+class BulkDeleteCounterTests(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'secret')
+        self.first = User.objects.create_user('first', 'first@example.com', 'secret')
+        self.second = User.objects.create_user('second', 'second@example.com', 'secret')
+        start = timezone.now() + datetime.timedelta(days=30)
+        self.event = Event.objects.create(
+            title="Launch", description="", location="Hall", created_by=self.admin, capacity=1,
+            start_date=start, end_date=start + datetime.timedelta(hours=3),
+        )
+        self.accepted = Invitation.objects.create(
+            event=self.event, user=self.first, email='first@example.com', name="First", status='accepted',
+        )
+        self.waiting = Invitation.objects.create(
+            event=self.event, user=self.second, email='second@example.com', name="Second",
+        )
+
+    def _rsvp(self, invitation):
+        self.client.post(reverse('rsvp', args=[invitation.uuid]), {'response': 'accepted'})
+        invitation.refresh_from_db()
+        return invitation.status
+
+    def test_admin_delete_frees_the_seat(self):
+        self.client.force_login(self.admin)
+        self.client.post(reverse('admin:events_invitation_changelist'), {
+            'action': 'delete_selected', '_selected_action': [self.accepted.pk], 'post': 'yes',
+        })
+        self.client.logout()
+
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.accepted_count, self.event.pending_count), (0, 1))
+        self.assertEqual(self._rsvp(self.waiting), 'accepted')
+
+    def test_deleting_guest_account_frees_the_seat(self):
+        self.first.delete()
+
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.accepted_count, self.event.pending_count), (0, 1))
+        self.assertTrue(RemovedInvitation.objects.filter(uuid=self.accepted.uuid).exists())
+        self.assertEqual(self._rsvp(self.waiting), 'accepted')
+
+
+class ReconcileEventCountersTests(TestCase):
+
+    def test_recounts_drifted_events(self):
+        organizer = User.objects.create_user('organizer', password='secret')
+        start = timezone.now() + datetime.timedelta(days=30)
+        event = Event.objects.create(
+            title="Launch", description="", location="Hall", created_by=organizer,
+            start_date=start, end_date=start + datetime.timedelta(hours=3),
+        )
+        Invitation.objects.create(event=event, user=organizer, email='a@example.com', name="A", status='accepted')
+        Event.objects.filter(pk=event.pk).update(accepted_count=5, pending_count=2)
+
+        out = StringIO()
+        call_command('reconcile_event_counters', batch_size=1, stdout=out)
+
+        event.refresh_from_db()
+        self.assertEqual((event.accepted_count, event.pending_count), (1, 0))
+        self.assertIn("1 events with drifted counters fixed", out.getvalue())
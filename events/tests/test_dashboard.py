@@ -0,0 +1,62 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import Event, Invitation
+from events.pagination import encode_cursor
+
+
+# Every read stays on the primary, so assertNumQueries sees all of them
+@override_settings(REPLICA_READ_VIEWS=[])
+class DashboardQueryBudgetTests(TestCase):
+    # Session, user, created events page, invited events page
+    QUERY_BUDGET = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('organizer', password='secret')
+        host = User.objects.create_user('host', password='secret')
+        start = timezone.now() + datetime.timedelta(days=1)
+        Event.objects.bulk_create(
+            # Half are the user's own, half are hosted by someone else and invite the user
+            Event(
+                title=f"Event {i}", description="", location="Hall", created_by=cls.user if i % 2 else host,
+                start_date=start + datetime.timedelta(hours=i), end_date=start + datetime.timedelta(hours=i + 2),
+            )
+            for i in range(1000)
+        )
+        Invitation.objects.bulk_create(
+            Invitation(event=event, user=cls.user, email='organizer@example.com', name="Organizer")
+            for event in Event.objects.filter(created_by=host)
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_dashboard_with_1000_events_stays_within_budget(self):
+        for event_filter in ('upcoming', 'all', 'past'):
+            with self.subTest(filter=event_filter), self.assertNumQueries(self.QUERY_BUDGET):
+                response = self.client.get(reverse('dashboard'), {'filter': event_filter})
+                self.assertEqual(response.status_code, 200)
+
+    def test_later_pages_stay_within_budget(self):
+        response = self.client.get(reverse('dashboard'))
+        self.assertTrue(response.context['created_next'])
+        self.assertTrue(response.context['invited_next'])
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            response = self.client.get(reverse('dashboard'), {
+                'created_cursor': response.context['created_next'],
+                'invited_cursor': response.context['invited_next'],
+            })
+        self.assertEqual(len(response.context['created_events']), 20)
+        self.assertEqual(len(response.context['invited_events']), 20)
+
+    def test_tampered_cursor_falls_back_to_first_page(self):
+        cursor = encode_cursor(['2020-02-30T10:00:00+00:00', 1])
+        response = self.client.get(reverse('dashboard'), {'created_cursor': cursor, 'invited_cursor': cursor})
+        self.assertEqual(response.status_code, 200)
+        first_page = self.client.get(reverse('dashboard'))
+        self.assertEqual(list(response.context['created_events']), list(first_page.context['created_events']))
@@ -0,0 +1,54 @@
+import csv
+import datetime
+import io
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import Event, Invitation
+
+
+@override_settings(REPLICA_READ_VIEWS=[])
+class ExportGuestsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user('organizer', password='secret')
+        start = timezone.now() + datetime.timedelta(days=30)
+        cls.event = Event.objects.create(
+            title="Launch", description="", location="Hall", created_by=cls.organizer,
+            start_date=start, end_date=start + datetime.timedelta(hours=3),
+        )
+        for email, name in [
+            ('formula@example.com', '=cmd|\' /C calc\'!A0'),
+            ('plus@example.com', '+1 guest'),
+            ('at@example.com', '@SUM(A1)'),
+            ('tab@example.com', '\tTab'),
+            ('-dash@example.com', 'Dash'),
+            ('plain@example.com', 'Ann Smith'),
+        ]:
+            Invitation.objects.create(event=cls.event, user=cls.organizer, email=email, name=name)
+
+    def setUp(self):
+        self.client.force_login(self.organizer)
+
+    def _export(self, fmt):
+        response = self.client.get(reverse('export_guests', args=[self.event.pk, 'invitations', fmt]))
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_cells_that_would_run_as_formulas_are_quoted(self):
+        rows = {row['email']: row['name'] for row in csv.DictReader(io.StringIO(self._export('csv')))}
+
+        self.assertEqual(rows['formula@example.com'], '\'=cmd|\' /C calc\'!A0')
+        self.assertEqual(rows['plus@example.com'], "'+1 guest")
+        self.assertEqual(rows['at@example.com'], "'@SUM(A1)")
+        self.assertEqual(rows['tab@example.com'], "'\tTab")
+        self.assertEqual(rows["'-dash@example.com"], "Dash")
+        self.assertEqual(rows['plain@example.com'], "Ann Smith")
+
+    def test_ndjson_keeps_values_as_they_are(self):
+        names = [json.loads(line)['name'] for line in self._export('ndjson').splitlines()]
+        self.assertIn('=cmd|\' /C calc\'!A0', names)
@@ -0,0 +1,91 @@
+import datetime
+import os
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError
+
+from events.models import Event
+from events.tasks import process_event_image
+
+
+class ProcessEventImageTests(TestCase):
+
+    def setUp(self):
+        self.media_root = media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root, EVENT_IMAGE_WIDTHS=(320, 640))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        start = timezone.now() + datetime.timedelta(days=30)
+        self.event = Event.objects.create(
+            title="Launch", description="", location="Hall",
+            created_by=User.objects.create_user('organizer'),
+            start_date=start, end_date=start + datetime.timedelta(hours=3),
+        )
+
+    def _jpeg(self, size=(1000, 600), exif=None):
+        buffer = BytesIO()
+        Image.new('RGB', size, 'teal').save(buffer, 'JPEG', exif=exif.tobytes() if exif else b'')
+        return buffer.getvalue()
+
+    def _process(self):
+        process_event_image.apply(args=(self.event.pk,), throw=True)
+        self.event.refresh_from_db()
+        return self.event.image_variants
+
+    def _stored_files(self):
+        return sorted(os.listdir(os.path.join(self.media_root, 'event_images')))
+
+    def test_builds_variants_no_wider_than_the_original(self):
+        self.event.image.save('party.jpg', ContentFile(self._jpeg()))
+        variants = self._process()
+
+        self.assertEqual((variants['width'], variants['height']), (1000, 600))
+        for key, fmt in (('webp', 'WEBP'), ('jpeg', 'JPEG')):
+            self.assertEqual([width for width, _ in variants[key]], [320, 640, 1000])
+            for width, name in variants[key]:
+                with self.event.image.storage.open(name) as f, Image.open(f) as image:
+                    self.assertEqual((image.format, image.width), (fmt, width))
+
+    def test_strips_exif_and_turns_the_original_upright(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # orientation: rotate 90 degrees clockwise to view
+        exif[0x010F] = "Phone maker"
+        self.event.image.save('phone.jpg', ContentFile(self._jpeg(exif=exif)))
+        variants = self._process()
+
+        with self.event.image.open('rb') as f, Image.open(f) as image:
+            self.assertEqual(dict(image.getexif()), {})
+            self.assertEqual(image.size, (600, 1000))
+        self.assertEqual((variants['width'], variants['height']), (600, 1000))
+
+    def test_same_picture_uploaded_under_a_new_name_is_not_reprocessed(self):
+        exif = Image.Exif()
+        exif[0x010F] = "Phone maker"
+        data = self._jpeg(exif=exif)
+        self.event.image.save('first.jpg', ContentFile(data))
+        variants = self._process()
+        stored = self._stored_files()
+
+        self.event.image.save('second.jpg', ContentFile(data))
+        self.assertEqual(self._process(), variants)
+        self.assertEqual(self.event.image.name, variants['source'])
+        self.assertEqual(self._stored_files(), stored)
+
+    def test_unreadable_image_fails_the_task(self):
+        self.event.image.save('broken.jpg', ContentFile(b'not an image'))
+        with self.assertRaises(UnidentifiedImageError):
+            process_event_image.apply(args=(self.event.pk,), throw=True)
+
+    def test_deleted_event_is_skipped(self):
+        event_id = self.event.pk
+        self.event.delete()
+        result = process_event_image.apply(args=(event_id,), throw=True)
+        self.assertTrue(result.successful())
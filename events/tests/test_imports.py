@@ -0,0 +1,48 @@
+import datetime
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from events.models import Event, GuestImport
+from events.tasks import import_guests
+
+
+class ImportGuestsTests(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.organizer = User.objects.create_user('organizer')
+        start = timezone.now() + datetime.timedelta(days=30)
+        self.event = Event.objects.create(
+            title="Launch", description="", location="Hall", created_by=self.organizer,
+            start_date=start, end_date=start + datetime.timedelta(hours=3),
+        )
+
+    def _import(self, content):
+        guest_import = GuestImport(event=self.event, uploaded_by=self.organizer)
+        guest_import.file.save('guests.csv', ContentFile(content.encode()))
+        import_guests.apply(args=(guest_import.pk, 'http://testserver/'), throw=True)
+        guest_import.refresh_from_db()
+        return guest_import
+
+    def test_first_row_for_an_address_names_the_guest(self):
+        guest_import = self._import("email,name\na@x.com,Ann\nA@x.com,Dup\n")
+
+        self.assertEqual(list(self.event.invitations.values_list('email', 'name')), [('a@x.com', "Ann")])
+        self.assertEqual((guest_import.created_count, guest_import.skipped_count), (1, 1))
+
+    def test_progress_counts_records_not_lines(self):
+        guest_import = self._import('email,name\nb@x.com,"Bea\nfrom sales"\nc@x.com,Cy\n\n\n')
+
+        self.assertEqual(guest_import.status, 'done')
+        self.assertEqual((guest_import.total_rows, guest_import.processed_rows), (2, 2))
+        self.assertEqual(guest_import.progress, 100)
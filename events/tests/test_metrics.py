@@ -0,0 +1,27 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from events import metrics
+from events.tasks import process_event_image
+
+
+@override_settings(REPLICA_READ_VIEWS=[], METRICS_TOKEN=None)
+class MetricsEndpointTests(TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(metrics, '_registry', metrics.Registry())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reports_requests_home_cache_and_tasks(self):
+        self.client.get(reverse('home'))
+        self.client.get(reverse('home'))
+        process_event_image.delay(0)
+
+        body = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('events_http_request_duration_seconds_count{view="home"} 2', body)
+        self.assertIn('events_home_cache_requests_total{result="miss"} 1', body)
+        self.assertIn('events_home_cache_requests_total{result="hit"} 1', body)
+        self.assertIn('events_celery_task_duration_seconds_count{task="events.tasks.process_event_image"} 1', body)
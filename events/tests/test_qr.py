@@ -0,0 +1,37 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import Event, Invitation
+
+
+@override_settings(REPLICA_READ_VIEWS=[])
+class InvitationQRTests(TestCase):
+
+    def setUp(self):
+        organizer = User.objects.create_user('organizer')
+        start = timezone.now() + datetime.timedelta(days=30)
+        event = Event.objects.create(
+            title="Launch", description="", location="Hall", created_by=organizer,
+            start_date=start, end_date=start + datetime.timedelta(hours=3),
+        )
+        self.invitation = Invitation.objects.create(event=event, user=organizer, email='guest@example.com', name="Guest")
+        self.url = reverse('invitation_qr', args=[self.invitation.uuid, 'svg'])
+
+    def test_serves_and_revalidates_code(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/svg+xml')
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_deleted_invitation_code_is_gone_despite_cache_and_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.invitation.delete()
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 404)
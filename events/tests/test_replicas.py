@@ -0,0 +1,77 @@
+import datetime
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import OperationalError, connections
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from events import replicas
+from events.models import Event
+
+
+def replicate():
+    """Copy the primary onto the replica, as replication would."""
+    for alias in ('default', 'replica1'):
+        connections[alias].ensure_connection()
+    connections['default'].connection.backup(connections['replica1'].connection)
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    databases = {'default', 'replica1'}
+
+    def setUp(self):
+        replicas._down_until.clear()
+        self.user = User.objects.create_user('organizer', password='secret')
+        self.replicated = self._event("Replicated")
+        replicate()
+        # Written after the last replication, so only the primary has it
+        self.lagging = self._event("Lagging")
+
+    def _event(self, title):
+        start = timezone.now() + datetime.timedelta(days=30)
+        return Event.objects.create(
+            title=title, description="", location="Hall", is_public=True, created_by=self.user,
+            start_date=start, end_date=start + datetime.timedelta(hours=2),
+        )
+
+    def test_read_view_reads_from_replica(self):
+        with CaptureQueriesContext(connections['replica1']) as replica_queries:
+            response = self.client.get(reverse('event_detail', args=[self.replicated.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(replica_queries.captured_queries)
+
+        response = self.client.get(reverse('event_detail', args=[self.lagging.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_post_pins_client_to_primary(self):
+        response = self.client.post(reverse('register'), {})
+        self.assertIn('pin_primary', response.cookies)
+
+        with CaptureQueriesContext(connections['replica1']) as replica_queries:
+            response = self.client.get(reverse('event_detail', args=[self.lagging.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(replica_queries.captured_queries, [])
+
+    def test_falls_back_to_primary_when_replica_is_down(self):
+        connections['replica1'].close()
+        with mock.patch.object(connections['replica1'], 'ensure_connection', side_effect=OperationalError), \
+                self.assertLogs('events.replicas', 'WARNING'):
+            response = self.client.get(reverse('event_detail', args=[self.lagging.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('replica1', replicas._down_until)
+
+    def test_session_is_read_from_primary(self):
+        # The session is created after replication, so the replica has never seen it
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('home'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.user, self.user)
+        self.assertNotIn('sessionid', response.cookies)
+
+    def test_other_views_read_from_primary(self):
+        with CaptureQueriesContext(connections['replica1']) as replica_queries:
+            self.client.post(reverse('register'), {})
+        self.assertEqual(replica_queries.captured_queries, [])
@@ -0,0 +1,36 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from events.models import Event
+from events.search import FTS_TABLE, search_events
+
+
+class SQLiteSearchIndexTests(TestCase):
+
+    def setUp(self):
+        self.organizer = User.objects.create_user('organizer')
+        start = timezone.now() + datetime.timedelta(days=30)
+        self.event = Event.objects.create(
+            title="Harbour jazz night", description="", location="Pier 4", created_by=self.organizer,
+            start_date=start, end_date=start + datetime.timedelta(hours=3), is_public=True,
+        )
+
+    def _indexed(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT rowid FROM {FTS_TABLE}")
+            return [row[0] for row in cursor.fetchall()]
+
+    def test_deleted_event_leaves_the_index(self):
+        self.assertEqual(list(search_events(Event.objects.all(), "jazz")), [self.event])
+        self.event.delete()
+
+        self.assertEqual(self._indexed(), [])
+        self.assertEqual(list(search_events(Event.objects.all(), "jazz")), [])
+
+    def test_events_deleted_with_their_organizer_leave_the_index(self):
+        self.organizer.delete()
+        self.assertEqual(self._indexed(), [])
@@ -0,0 +1,103 @@
+import math
+import threading
+import time
+
+from django.conf import settings
+
+
+class TokenBucket:
+    """
+    Refills ``rate`` tokens a second up to ``capacity``. acquire() takes its
+    tokens straight away and sleeps off any shortfall, so callers are paced
+    rather than refused. Limits one process; see RedisTokenBucket.
+    """
+
+    def __init__(self, rate, capacity, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens):
+        """Take ``tokens`` and return the seconds to wait before using them."""
+        with self._lock:
+            now = self.clock()
+            refill = max(0.0, now - self._updated) * self.rate
+            self._tokens = min(self.capacity, self._tokens + refill) - tokens
+            self._updated = max(now, self._updated)
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self, tokens=1):
+        wait = self.reserve(tokens)
+        if wait:
+            self.sleep(wait)
+        return wait
+
+
+class RedisTokenBucket(TokenBucket):
+    """The same bucket kept in Redis, so every worker shares one limit."""
+
+    # Refill, take and report the wait in one round trip; Redis' clock keeps workers consistent
+    SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local capacity = tonumber(ARGV[2])
+    local now = redis.call('TIME')
+    now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local tokens = tonumber(state[1]) or capacity
+    local updated = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + (now - updated) * rate) - tonumber(ARGV[3])
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+    redis.call('EXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate) + 1)
+    return tostring(math.max(0, -tokens / rate))
+    """
+
+    def __init__(self, url, key, rate, capacity, sleep=time.sleep):
+        import redis
+
+        self.rate = rate
+        self.capacity = capacity
+        self.sleep = sleep
+        self.key = key
+        self._script = redis.Redis.from_url(url).register_script(self.SCRIPT)
+
+    def reserve(self, tokens):
+        return float(self._script(keys=[self.key], args=[self.rate, self.capacity, tokens]))
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+_override = None
+
+
+def bulk_mail_bucket():
+    """
+    Bucket pacing bulk invitation and reminder mail, or None when
+    EMAIL_BULK_RATE_LIMIT (messages a second) is unset. Single transactional
+    emails skip it and use the headroom left under the provider's limit.
+    """
+    if _override is not None:
+        return _override
+    rate = getattr(settings, 'EMAIL_BULK_RATE_LIMIT', None)
+    if not rate:
+        return None
+    burst = getattr(settings, 'EMAIL_BULK_BURST', max(1, math.ceil(rate)))
+    url = getattr(settings, 'EMAIL_RATE_LIMIT_REDIS_URL', None)
+    with _buckets_lock:
+        key = (rate, burst, url)
+        if key not in _buckets:
+            if url:
+                _buckets[key] = RedisTokenBucket(url, 'events:throttle:bulk-mail', rate, burst)
+            else:
+                _buckets[key] = TokenBucket(rate, burst)
+        return _buckets[key]
+
+
+def use_bulk_mail_bucket(bucket):
+    """Replace the bulk mail bucket (None restores the configured one); returns the previous override."""
+    global _override
+    previous, _override = _override, bucket
+    return previous
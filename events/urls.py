@@ -4,6 +4,7 @@ from . import views
 urlpatterns = [
     path('', views.home, name='home'),
     path('register/', views.register, name='register'),
+    path('metrics/', views.metrics, name='metrics'),
     path('dashboard/', views.dashboard, name='dashboard'),
     
     # Event CRUD
@@ -11,15 +12,26 @@ urlpatterns = [
     path('events/<int:pk>/', views.event_detail, name='event_detail'),
     path('events/<int:pk>/update/', views.event_update, name='event_update'),
     path('events/<int:pk>/delete/', views.event_delete, name='event_delete'),
+    path('api/events/', views.browse_events, name='browse_events'),
     
     # Invitations
     path('events/<int:pk>/invite/', views.invite_to_event, name='invite_to_event'),
     path('events/<int:pk>/bulk-invite/', views.bulk_invite, name='bulk_invite'),
+    path('events/<int:pk>/import/', views.guest_import_create, name='guest_import_create'),
+    path('events/<int:pk>/import/<int:import_id>/', views.guest_import_detail, name='guest_import_detail'),
+    path('events/<int:pk>/import/<int:import_id>/progress/', views.guest_import_progress, name='guest_import_progress'),
     path('events/<int:pk>/invitations/', views.event_invitations, name='event_invitations'),
+    path('events/<int:pk>/live/', views.event_live, name='event_live'),
+    path('events/<int:pk>/export/<str:kind>.<str:fmt>', views.export_guests, name='export_guests'),
     path('rsvp/<uuid:uuid>/', views.rsvp, name='rsvp'),
+    path('qr/<uuid:uuid>.<str:fmt>', views.invitation_qr, name='invitation_qr'),
     
     # Check-in
     path('events/<int:pk>/check-in/<int:invitation_id>/', views.check_in, name='check_in'),
     path('events/<int:pk>/scan-qr/', views.scan_qr, name='scan_qr'),
     path('events/<int:pk>/verify-qr/', views.verify_qr, name='verify_qr'),
+    path('events/<int:pk>/api/check-in/', views.check_in_api, name='check_in_api'),
+    path('events/<int:pk>/api/check-in/manifest/', views.check_in_manifest_view, name='check_in_manifest'),
+    path('events/<int:pk>/api/check-in/manifest/delta/', views.check_in_manifest_delta_view, name='check_in_manifest_delta'),
+    path('events/<int:pk>/api/check-in/upload/', views.check_in_upload, name='check_in_upload'),
 ]
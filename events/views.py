@@ -1,24 +1,48 @@
+import asyncio
+import datetime
+import hashlib
+import json
+
+from asgiref.sync import sync_to_async
 
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login
 from django.contrib import messages
+from django.contrib.messages.storage.cookie import CookieStorage
 from django.utils import timezone
-from django.db.models import Q,Count
-from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import http_date
+from django.db.models import Q, Exists, OuterRef, Subquery
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseNotAllowed, Http404, JsonResponse, StreamingHttpResponse
+from django.core.cache import cache
+from django.views.decorators.cache import cache_control
 from django.urls import reverse
-from .models import Event, Invitation
-from .forms import EventForm, InvitationForm, BulkInvitationForm, RSVPForm, CustomUserCreationForm
-from .tasks import send_invitation_email, send_reminder_email
+from .models import Event, GuestImport, Invitation
+from .qr import FORMATS, render_qr_code
+from .pagination import keyset_page
+from . import caching, live
+from .search import search_events
+from .metrics import get_registry as get_metrics_registry
+from .exports import CONTENT_TYPES as EXPORT_CONTENT_TYPES, EXPORT_FIELDS, streaming_export
+from .forms import EventForm, InvitationForm, BulkInvitationForm, GuestImportForm, RSVPForm, CustomUserCreationForm
+from .tasks import send_invitation_email, send_reminder_email, import_guests
+from .decorators import aget_object_or_404, ais_authenticated, async_login_required
+from .services import (
+    acheck_in_guests, bulk_invite_emails, check_in_guests, check_in_manifest, check_in_manifest_delta,
+    CHECK_IN_OK, CHECK_IN_ALREADY, CHECK_IN_NOT_ACCEPTED, CHECK_IN_UNKNOWN,
+)
 from django.contrib.auth.models import User
 from django.conf import settings
 
 
 def home(request):
-    upcoming_events = Event.objects.filter(
+    upcoming_events = caching.get_upcoming_events(request.user, lambda: Event.objects.filter(
         Q(is_public=True) | Q(invitations__user=request.user.id if request.user.is_authenticated else None),
         end_date__gte=timezone.now()
-    ).distinct().order_by('start_date')[:5]
+    ).distinct().order_by('start_date')[:5])
     
     return render(request, 'events/home.html', {
         'upcoming_events': upcoming_events
@@ -43,16 +67,17 @@ def register(request):
 
 @login_required
 def dashboard(request):
-    # Base queryset for events created by the user
-    created_events = Event.objects.filter(created_by=request.user).order_by('-start_date').annotate(
-        accepted_count=Count('invitations', filter=Q(invitations__status='accepted')),
-        total_invites=Count('invitations')
-    )
+    # Base queryset for events created by the user; RSVP counts are stored on the event
+    created_events = Event.objects.filter(created_by=request.user)
 
-    # Base queryset for events the user is invited to (excluding own created events)
+    # Base queryset for events the user is invited to (excluding own created events),
+    # with the user's own RSVP status pulled in alongside each event
+    my_invitations = Invitation.objects.filter(event=OuterRef('pk'), user=request.user)
     invited_events = Event.objects.filter(
-        invitations__user=request.user
-    ).exclude(created_by=request.user).order_by('-start_date')
+        Exists(my_invitations)
+    ).exclude(created_by=request.user).annotate(
+        my_status=Subquery(my_invitations.order_by('id').values('status')[:1])
+    )
 
     # Filter parameters
     event_filter = request.GET.get('filter', 'upcoming')
@@ -71,9 +96,20 @@ def dashboard(request):
         created_events = created_events.filter(end_date__gte=timezone.now())
         invited_events = invited_events.filter(end_date__gte=timezone.now())
 
+    # Each section pages independently with its own cursor
+    page_size = getattr(settings, 'DASHBOARD_PAGE_SIZE', 20)
+    created_page, created_next = keyset_page(
+        created_events, ('-start_date', '-id'), request.GET.get('created_cursor'), page_size
+    )
+    invited_page, invited_next = keyset_page(
+        invited_events, ('-start_date', '-id'), request.GET.get('invited_cursor'), page_size
+    )
+
     return render(request, 'events/dashboard.html', {
-        'created_events': created_events,
-        'invited_events': invited_events,
+        'created_events': created_page,
+        'created_next': created_next,
+        'invited_events': invited_page,
+        'invited_next': invited_next,
         'event_filter': event_filter
     })
 
@@ -208,37 +244,16 @@ def bulk_invite(request, pk):
         form = BulkInvitationForm(request.POST)
         if form.is_valid():
             emails = form.cleaned_data['emails']
-            success_count = 0
-            
-            for email in emails:
-                # Check if invitation already exists
-                if Invitation.objects.filter(event=event, email=email).exists():
-                    continue
-                
-                # Check if user with this email exists
-                try:
-                    user = User.objects.get(email=email)
-                except User.DoesNotExist:
-                    user = request.user  # Fallback to event creator
-                
-                invitation = Invitation.objects.create(
-                    event=event,
-                    user=user,
-                    email=email,
-                    name=email.split('@')[0]  # Use part of email as name
-                )
-                if not invitation.uuid:
-                    invitation.uuid = uuid.uuid4()
-                    invitation.save()
-                # Send invitation email asynchronously
-                invitation_url = request.build_absolute_uri(
-                    reverse('rsvp', kwargs={'uuid': invitation.uuid})
-                )
-                send_invitation_email.delay(invitation.id, invitation_url)
-                
-                success_count += 1
-            
-            messages.success(request, f"{success_count} invitations sent successfully!")
+            result = bulk_invite_emails(
+                event,
+                emails,
+                fallback_user=request.user,  # Fallback to event creator
+                base_url=request.build_absolute_uri('/'),
+            )
+
+            messages.success(request, f"{result.created} invitations sent successfully!")
+            if result.skipped:
+                messages.info(request, f"{result.skipped} addresses were skipped as duplicates or already invited.")
             return redirect('event_invitations', pk=event.pk)
     else:
         form = BulkInvitationForm()
@@ -248,26 +263,139 @@ def bulk_invite(request, pk):
         'event': event
     })
 
+@login_required
+def guest_import_create(request, pk):
+    event = get_object_or_404(Event, pk=pk, created_by=request.user)
+
+    if request.method == 'POST':
+        form = GuestImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            guest_import = GuestImport.objects.create(
+                event=event,
+                uploaded_by=request.user,
+                file=form.cleaned_data['file'],
+            )
+            # Import in the background; the upload is already on disk
+            import_guests.delay(guest_import.id, request.build_absolute_uri('/'))
+            messages.info(request, "Your guest list is being imported.")
+            return redirect('guest_import_detail', pk=event.pk, import_id=guest_import.pk)
+    else:
+        form = GuestImportForm()
+
+    return render(request, 'events/guest_import.html', {
+        'form': form,
+        'event': event
+    })
+
+@login_required
+def guest_import_detail(request, pk, import_id):
+    guest_import = get_object_or_404(
+        GuestImport.objects.select_related('event'), pk=import_id, event_id=pk, event__created_by=request.user
+    )
+    return render(request, 'events/guest_import.html', {
+        'event': guest_import.event,
+        'guest_import': guest_import,
+    })
+
+@login_required
+def guest_import_progress(request, pk, import_id):
+    guest_import = get_object_or_404(
+        GuestImport.objects.defer('file'), pk=import_id, event_id=pk, event__created_by=request.user
+    )
+    return JsonResponse({
+        'status': guest_import.status,
+        'progress': guest_import.progress,
+        'total_rows': guest_import.total_rows,
+        'processed_rows': guest_import.processed_rows,
+        'created': guest_import.created_count,
+        'skipped': guest_import.skipped_count,
+        'errors': guest_import.error_count,
+        'error_rows': guest_import.errors[:100],
+    })
+
 @login_required
 def event_invitations(request, pk):
     event = get_object_or_404(Event, pk=pk, created_by=request.user)
-    invitations = Invitation.objects.filter(event=event).order_by('-created_at')
+    invitations = Invitation.objects.filter(event=event)
+
+    # The event keeps its own counters, and the page keeps them live over event_live
+    counts = {
+        'total_count': event.invitation_count,
+        'accepted_count': event.accepted_count,
+        'pending_count': event.pending_count,
+        'declined_count': event.declined_count,
+        'checked_in_count': event.checked_in_count,
+    }
+
+    status = request.GET.get('status', '')
+    if status in dict(Invitation.STATUS_CHOICES):
+        invitations = invitations.filter(status=status)
+    else:
+        status = ''
+    query = request.GET.get('q', '').strip()
+    if query:
+        invitations = invitations.filter(Q(email__istartswith=query) | Q(name__istartswith=query))
 
-    # Calculate status counts
-    accepted_count = invitations.filter(status='accepted').count()
-    pending_count = invitations.filter(status='pending').count()
-    declined_count = invitations.filter(status='declined').count()
+    page, next_cursor = keyset_page(
+        invitations,
+        ('-created_at', '-id'),
+        request.GET.get('cursor'),
+        getattr(settings, 'INVITATIONS_PAGE_SIZE', 50),
+    )
 
     return render(request, 'events/event_invitations.html', {
         'event': event,
-        'invitations': invitations,
-        'accepted_count': accepted_count,
-        'pending_count': pending_count,
-        'declined_count': declined_count,
+        'invitations': page,
+        'next_cursor': next_cursor,
+        'is_first_page': not request.GET.get('cursor'),
+        'status': status,
+        'query': query,
+        'status_choices': Invitation.STATUS_CHOICES,
+        **counts,
     })
 
-def rsvp(request, uuid):
-    invitation = get_object_or_404(Invitation, uuid=uuid)
+@async_login_required
+async def event_live(request, pk):
+    """
+    Server-Sent Events stream of an event's counters: a ``snapshot`` on
+    connect, then ``update`` messages with deltas and guest activity.
+    """
+    event = await aget_object_or_404(Event.objects.only('id'), pk=pk, created_by=request.user)
+    # Under WSGI a stream would hold a worker thread, so send the snapshot and
+    # let EventSource reconnect after its retry delay instead
+    max_age = getattr(settings, 'LIVE_STREAM_MAX_AGE', 300) if isinstance(request, ASGIRequest) else 0
+    response = StreamingHttpResponse(_live_stream(event.pk, max_age), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+async def _live_stream(event_id, max_age):
+    heartbeat = getattr(settings, 'LIVE_STREAM_HEARTBEAT', 15)
+    yield f"retry: {getattr(settings, 'LIVE_STREAM_RETRY_MS', 5000)}\n\n"
+    # Subscribe before reading the snapshot so no update falls between the two
+    async with live.get_hub().subscribe(live.channel_name(event_id)) as subscription:
+        yield await _live_snapshot(event_id)
+        # Streams end after max_age and the browser reconnects, so one left
+        # open by a vanished client doesn't linger
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_age
+        while (remaining := deadline - loop.time()) > 0:
+            data = await subscription.get(min(heartbeat, remaining))
+            if data is None:
+                yield ": keepalive\n\n"
+            elif data == live.RESYNC:
+                yield await _live_snapshot(event_id)
+            else:
+                yield f"event: update\ndata: {data}\n\n"
+
+async def _live_snapshot(event_id):
+    counters = await Event.objects.filter(pk=event_id).values(*Event.COUNTER_FIELDS).afirst()
+    return f"event: snapshot\ndata: {json.dumps(counters)}\n\n"
+
+async def rsvp(request, uuid):
+    # Async so that invitation-blast peaks don't hold one server thread per guest under ASGI
+    # One query for everything the page shows, organizer included
+    invitation = await aget_object_or_404(Invitation.objects.select_related('event__created_by'), uuid=uuid)
     event = invitation.event
     
     if event.is_past:
@@ -278,41 +406,105 @@ def rsvp(request, uuid):
         form = RSVPForm(request.POST)
         if form.is_valid():
             response = form.cleaned_data['response']
-            invitation.status = response
-            invitation.save()
+            # Re-sending the current answer writes nothing. set_status() needs a
+            # transaction, which the async ORM can't open.
+            if response != invitation.status and not await sync_to_async(invitation.set_status)(response):
+                messages.error(request, f"Sorry, {event.title} is already at full capacity.")
+                return redirect('rsvp', uuid=invitation.uuid)
             
             if response == 'accepted':
                 messages.success(request, f"You have successfully RSVP'd to {event.title}!")
             else:
                 messages.info(request, f"You have declined the invitation to {event.title}.")
             
-            if request.user.is_authenticated:
+            if await ais_authenticated(request):
                 return redirect('dashboard')
             else:
                 return redirect('home')
     else:
+        # Repeat opens of an unchanged invitation get a 304, unless a flash
+        # message is waiting to be shown
+        last_modified = int(max(invitation.updated_at, event.updated_at).timestamp())
+        if not request.COOKIES.get(CookieStorage.cookie_name):
+            not_modified = get_conditional_response(
+                request, etag=_rsvp_etag(request, invitation), last_modified=last_modified,
+            )
+            if not_modified is not None:
+                return _rsvp_validators(not_modified, request, invitation, last_modified)
         form = RSVPForm()
     
-    return render(request, 'events/rsvp_form.html', {
+    # Context processors read request.user and the session, so render in a thread
+    page = await sync_to_async(render)(request, 'events/rsvp_form.html', {
         'form': form,
         'invitation': invitation,
         'event': event
     })
+    if request.method != 'POST':
+        # Rendering may have issued the CSRF cookie, so take the tag afterwards
+        _rsvp_validators(page, request, invitation, last_modified)
+    return page
+
+def _rsvp_validators(response, request, invitation, last_modified):
+    response['ETag'] = _rsvp_etag(request, invitation)
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+def _rsvp_etag(request, invitation):
+    """
+    Validator for the RSVP page. Besides the invitation and event it shows,
+    the page embeds a CSRF token and depends on who is signed in, so the CSRF
+    secret and session cookie are part of it.
+    """
+    parts = [
+        invitation.uuid.hex,
+        invitation.updated_at.isoformat(),
+        invitation.event.updated_at.isoformat(),
+        request.META.get('CSRF_COOKIE', ''),
+        request.COOKIES.get(settings.SESSION_COOKIE_NAME, ''),
+    ]
+    return f'"{hashlib.sha1("|".join(parts).encode()).hexdigest()}"'
+
+@login_required
+def export_guests(request, pk, kind, fmt):
+    """
+    Stream an event's guest list (``invitations``) or its accepted guests
+    (``attendees``) as CSV or NDJSON, optionally filtered by
+    ``?status=accepted,pending`` and ``?checked_in=1``.
+    """
+    if kind not in ('invitations', 'attendees') or fmt not in EXPORT_CONTENT_TYPES:
+        raise Http404("Unknown export.")
+    event = get_object_or_404(Event.objects.only('id'), pk=pk, created_by=request.user)
+
+    invitations = Invitation.objects.filter(event=event).order_by('created_at', 'id')
+    if kind == 'attendees':
+        invitations = invitations.filter(status='accepted')
+    statuses = [status for status in request.GET.get('status', '').split(',') if status in dict(Invitation.STATUS_CHOICES)]
+    if statuses:
+        invitations = invitations.filter(status__in=statuses)
+    if request.GET.get('checked_in') in ('0', '1'):
+        invitations = invitations.filter(checked_in=request.GET['checked_in'] == '1')
+
+    return streaming_export(
+        invitations,
+        EXPORT_FIELDS,
+        fmt,
+        filename=f"event-{event.pk}-{kind}",
+        chunk_size=getattr(settings, 'EXPORT_CHUNK_SIZE', 2000),
+    )
 
 @login_required
 def check_in(request, pk, invitation_id):
     event = get_object_or_404(Event, pk=pk, created_by=request.user)
-    invitation = get_object_or_404(Invitation, id=invitation_id, event=event)
+    invitation = get_object_or_404(Invitation.objects.only('uuid'), id=invitation_id, event=event)
+    result = check_in_guests(event, [invitation.uuid])[0]
     
-    if invitation.status != 'accepted':
-        messages.error(request, f"{invitation.name} has not accepted the invitation.")
-    elif invitation.checked_in:
-        messages.info(request, f"{invitation.name} has already checked in at {invitation.checked_in_at}.")
+    if result.outcome == CHECK_IN_NOT_ACCEPTED:
+        messages.error(request, f"{result.name} has not accepted the invitation.")
+    elif result.outcome == CHECK_IN_ALREADY:
+        messages.info(request, f"{result.name} has already checked in at {result.checked_in_at}.")
     else:
-        invitation.checked_in = True
-        invitation.checked_in_at = timezone.now()
-        invitation.save()
-        messages.success(request, f"{invitation.name} has been checked in successfully!")
+        messages.success(request, f"{result.name} has been checked in successfully!")
     
     return redirect('event_invitations', pk=event.pk)
 
@@ -321,27 +513,206 @@ def scan_qr(request, pk):
     event = get_object_or_404(Event, pk=pk, created_by=request.user)
     return render(request, 'events/scan_qr.html', {'event': event})
 
-@login_required
-def verify_qr(request, pk):
+@async_login_required
+async def verify_qr(request, pk):
     if request.method == 'POST':
-        event = get_object_or_404(Event, pk=pk, created_by=request.user)
-        uuid = request.POST.get('uuid')
-        
-        try:
-            invitation = Invitation.objects.get(uuid=uuid, event=event)
-            
-            if invitation.status != 'accepted':
-                return HttpResponse(f"Error: {invitation.name} has not accepted the invitation.", status=400)
-            
-            if invitation.checked_in:
-                return HttpResponse(f"{invitation.name} already checked in at {invitation.checked_in_at}.", status=200)
-            
-            invitation.checked_in = True
-            invitation.checked_in_at = timezone.now()
-            invitation.save()
-            
-            return HttpResponse(f"{invitation.name} checked in successfully!", status=200)
+        event = await aget_object_or_404(Event.objects.only('id'), pk=pk, created_by=request.user)
+        result = (await acheck_in_guests(event, [request.POST.get('uuid', '')]))[0]
         
-        except Invitation.DoesNotExist:
+        if result.outcome == CHECK_IN_UNKNOWN:
             return HttpResponse("Invalid QR code or invitation not found.", status=404)
+        if result.outcome == CHECK_IN_NOT_ACCEPTED:
+            return HttpResponse(f"Error: {result.name} has not accepted the invitation.", status=400)
+        if result.outcome == CHECK_IN_ALREADY:
+            return HttpResponse(f"{result.name} already checked in at {result.checked_in_at}.", status=200)
+        return HttpResponse(f"{result.name} checked in successfully!", status=200)
     return HttpResponse("Method not allowed", status=405)
+
+@async_login_required
+async def check_in_api(request, pk):
+    """
+    Check in one or many guests from a JSON body of ``{"uuid": ...}`` or
+    ``{"uuids": [...]}`` and report a machine-readable outcome for each.
+    """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    event = await aget_object_or_404(Event.objects.only('id'), pk=pk, created_by=request.user)
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'error': "Request body must be JSON."}, status=400)
+    if not isinstance(payload, dict):
+        return JsonResponse({'error': "Request body must be a JSON object."}, status=400)
+
+    uuids = payload.get('uuids', [payload['uuid']] if 'uuid' in payload else None)
+    if not isinstance(uuids, list) or not uuids:
+        return JsonResponse({'error': "Provide 'uuid' or a non-empty 'uuids' list."}, status=400)
+    limit = getattr(settings, 'CHECK_IN_BATCH_LIMIT', 500)
+    if len(uuids) > limit:
+        return JsonResponse({'error': f"At most {limit} uuids per request."}, status=400)
+
+    results = await acheck_in_guests(event, uuids)
+    return JsonResponse({
+        'checked_in': sum(result.outcome == CHECK_IN_OK for result in results),
+        'results': [result._asdict() for result in results],
+    })
+
+@login_required
+def check_in_manifest_view(request, pk):
+    """Sorted packed 16-byte uuids of guests still to be admitted, for offline scanners."""
+    event = get_object_or_404(Event.objects.only('id'), pk=pk, created_by=request.user)
+    manifest, cursor = check_in_manifest(event)
+    response = HttpResponse(manifest, content_type='application/octet-stream')
+    response['X-Manifest-Cursor'] = cursor
+    response['X-Manifest-Count'] = len(manifest) // 16
+    response['Cache-Control'] = 'private, no-store'
+    return response
+
+@login_required
+def check_in_manifest_delta_view(request, pk):
+    event = get_object_or_404(Event.objects.only('id'), pk=pk, created_by=request.user)
+    delta = check_in_manifest_delta(event, request.GET.get('cursor'))
+    if delta is None:
+        return JsonResponse({'error': "Invalid cursor; download the full manifest again."}, status=410)
+    return JsonResponse(delta)
+
+@async_login_required
+async def check_in_upload(request, pk):
+    """
+    Reconcile scans recorded offline, sent as
+    ``{"scans": [{"uuid": ..., "scanned_at": ISO 8601}, ...]}``.
+    """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    event = await aget_object_or_404(Event.objects.only('id'), pk=pk, created_by=request.user)
+    try:
+        payload = json.loads(request.body)
+        scans = payload['scans']
+        if not isinstance(scans, list):
+            raise TypeError
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'error': "Provide a JSON object with a 'scans' list."}, status=400)
+    limit = getattr(settings, 'CHECK_IN_UPLOAD_LIMIT', 5000)
+    if len(scans) > limit:
+        return JsonResponse({'error': f"At most {limit} scans per request."}, status=400)
+
+    # Keep the earliest sighting of each guest
+    scanned_at = {}
+    for scan in scans:
+        if not isinstance(scan, dict) or 'uuid' not in scan:
+            return JsonResponse({'error': "Each scan needs a 'uuid'."}, status=400)
+        # A scan without a time counts as now; one with a time we can't read is refused
+        # rather than losing when the guest actually arrived
+        raw = scan.get('scanned_at')
+        try:
+            when = parse_datetime(str(raw)) if raw else timezone.now()
+        except ValueError:
+            when = None
+        if when is None:
+            return JsonResponse(
+                {'error': f"Scan {scan['uuid']} has an invalid 'scanned_at'; use an ISO 8601 time."}, status=400,
+            )
+        if timezone.is_naive(when):
+            when = timezone.make_aware(when)
+        key = str(scan['uuid'])
+        scanned_at[key] = min(when, scanned_at.get(key, when))
+
+    results = await acheck_in_guests(event, list(scanned_at), scanned_at=scanned_at)
+    return JsonResponse({
+        'checked_in': sum(result.outcome == CHECK_IN_OK for result in results),
+        'results': [result._asdict() for result in results],
+    })
+
+def browse_events(request):
+    """
+    Public JSON listing of events with optional full-text ``q``, a
+    ``from``/``to`` date range on the start date and a ``location`` prefix.
+    """
+    events = Event.objects.filter(is_public=True).only(
+        'id', 'title', 'description', 'location', 'start_date', 'end_date', 'capacity', 'accepted_count',
+    )
+
+    start_from = parse_date(request.GET.get('from', ''))
+    start_to = parse_date(request.GET.get('to', ''))
+    # Compare against datetimes rather than start_date__date so the index on start_date applies
+    if start_from:
+        events = events.filter(start_date__gte=timezone.make_aware(datetime.datetime.combine(start_from, datetime.time.min)))
+    else:
+        events = events.filter(end_date__gte=timezone.now())
+    if start_to:
+        events = events.filter(start_date__lt=timezone.make_aware(datetime.datetime.combine(start_to, datetime.time.min)) + datetime.timedelta(days=1))
+    location = request.GET.get('location', '').strip()
+    if location:
+        events = events.filter(location__istartswith=location)
+
+    query = request.GET.get('q', '').strip()
+    if query:
+        events = search_events(events, query)
+    else:
+        events = events.order_by('start_date', 'id')
+
+    # Offset pages without a COUNT(*); one extra row tells us if there is more
+    try:
+        page = max(1, int(request.GET.get('page', 1)))
+        page_size = min(100, max(1, int(request.GET.get('page_size', 20))))
+    except ValueError:
+        return JsonResponse({'error': "page and page_size must be integers."}, status=400)
+    offset = (page - 1) * page_size
+    rows = list(events[offset:offset + page_size + 1])
+
+    return JsonResponse({
+        'page': page,
+        'has_next': len(rows) > page_size,
+        'results': [
+            {
+                'id': event.id,
+                'title': event.title,
+                'description': event.description[:300],
+                'location': event.location,
+                'start_date': event.start_date.isoformat(),
+                'end_date': event.end_date.isoformat(),
+                'capacity': event.capacity,
+                'attendee_count': event.attendee_count,
+                'url': reverse('event_detail', kwargs={'pk': event.id}),
+            }
+            for event in rows[:page_size]
+        ],
+    })
+
+def metrics(request):
+    """Request, SQL, home cache and task metrics in the Prometheus text format."""
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return HttpResponse("Unauthorized", status=401)
+    return HttpResponse(get_metrics_registry().render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+QR_CODE_VERSION = 1
+
+
+def _qr_etag(uuid, fmt):
+    # The image is a pure function of the uuid, so the tag never needs the body
+    return f'"qr-{uuid}-{fmt}-v{QR_CODE_VERSION}"'
+
+# Not immutable: browsers revalidate hourly, so a deleted invitation's code stops loading
+@cache_control(private=True, max_age=60 * 60)
+def invitation_qr(request, uuid, fmt):
+    if fmt not in FORMATS:
+        raise Http404("Unsupported QR code format.")
+    # Before the cache or a 304, which would otherwise outlive the invitation
+    if not Invitation.objects.filter(uuid=uuid).exists():
+        raise Http404("Invitation not found.")
+    tag = _qr_etag(uuid, fmt)
+    not_modified = get_conditional_response(request, etag=tag)
+    if not_modified is not None:
+        not_modified['ETag'] = tag
+        return not_modified
+
+    cache_key = f"invitation-qr:{uuid}:{fmt}:v{QR_CODE_VERSION}"
+    content = cache.get(cache_key)
+    if content is None:
+        content = render_qr_code(str(uuid), fmt)
+        cache.set(cache_key, content, timeout=getattr(settings, 'QR_CODE_CACHE_TIMEOUT', 60 * 60 * 24))
+
+    response = HttpResponse(content, content_type=FORMATS[fmt])
+    response['ETag'] = tag
+    return response